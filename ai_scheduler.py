@@ -0,0 +1,112 @@
+# Staggered think-tick scheduler for AI agents. Instead of every agent thinking
+# every frame, each is ticked at the interval of the level-of-detail band its
+# distance to a focus point (usually the player) falls in, and a frame stops
+# starting new ticks once its time budget is spent. Overdue agents are simply
+# first in line next frame.
+
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+Vector = Tuple[float, float, float]
+
+# (max distance, seconds between thinks); 0 means every frame
+DEFAULT_LOD = ((10, 0.0), (25, .1), (40, .25), (math.inf, 1.0))
+
+def distance_xz(a: Vector, b: Vector) -> float:
+    return math.hypot(a[0] - b[0], a[2] - b[2])
+
+class ThinkScheduler:
+    """
+    Calls agent.think(dt) for registered agents, where dt is the time since
+    that agent last thought. An agent's position is read from agent.position
+    when it thinks, to pick the interval until its next think.
+    """
+    def __init__(self,
+                 focus: Callable[[], Vector],
+                 lod: Sequence[Tuple[float, float]] = DEFAULT_LOD,
+                 budget: float = .002,
+                 distance: Callable[[Vector, Vector], float] = distance_xz
+            ):
+        self.focus = focus
+        self.lod = tuple(lod)
+        self.budget = budget          # seconds of think() per frame
+        self.distance = distance
+        self.time = 0.0
+        self.ticks = 0                # thinks run last frame
+        self.over_budget = False      # whether last frame left due thinks for later
+
+        self._queue: List[list] = []  # [due, order, agent], agent None once removed
+        self._entries: Dict = {}
+        self._last_think: Dict = {}
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, agent) -> bool:
+        return agent in self._entries
+
+    def interval(self, distance: float) -> float:
+        for max_distance, interval in self.lod:
+            if distance <= max_distance:
+                return interval
+        return self.lod[-1][1]
+
+    def add(self, agent) -> None:
+        """Register agent. First thinks are spread over the agent's interval."""
+        if agent in self._entries:
+            return
+        order = next(self._order)
+        interval = self.interval(self.distance(self.focus(), agent.position))
+        # golden-ratio offsets keep any number of agents evenly staggered
+        due = self.time + interval * ((order * 0.6180339887) % 1.0)
+        self._push(agent, due, order)
+        self._last_think[agent] = self.time
+
+    def remove(self, agent) -> None:
+        entry = self._entries.pop(agent, None)
+        if entry:
+            entry[2] = None
+        self._last_think.pop(agent, None)
+
+    def update(self, dt: float) -> None:
+        """Advance the clock by dt and run due thinks until the budget is spent."""
+        self.time += dt
+        now = self.time
+        queue = self._queue
+        focus = self.focus()
+        start = time.perf_counter()
+        ticks = 0
+        over_budget = False
+        thought = []
+        while queue and queue[0][0] <= now:
+            # always make progress, even if a single think is over budget
+            if ticks and time.perf_counter() - start >= self.budget:
+                over_budget = True
+                break
+            due, order, agent = heapq.heappop(queue)
+            if agent is None:
+                continue
+            del self._entries[agent]
+            agent.think(now - self._last_think[agent])
+            if agent in self._last_think:
+                self._last_think[agent] = now
+            ticks += 1
+            thought.append((agent, order))
+
+        # rescheduled after the loop so a zero interval means once per frame
+        for agent, order in thought:
+            if agent not in self._last_think:   # removed while thinking
+                continue
+            self._push(agent, now + self.interval(self.distance(focus, agent.position)), order)
+
+        self.ticks = ticks
+        self.over_budget = over_budget
+
+    def _push(self, agent, due: float, order: int) -> None:
+        entry = [due, order, agent]
+        self._entries[agent] = entry
+        heapq.heappush(self._queue, entry)
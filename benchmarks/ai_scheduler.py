@@ -0,0 +1,59 @@
+# Per-frame think cost for many agents spread around the player: thinking
+# every agent every frame against ThinkScheduler's distance LOD and budget.
+# Each think does about as much pure-Python work as an enemy's distance check,
+# facing and ray submit.
+#
+#   python benchmarks/ai_scheduler.py
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_scheduler import ThinkScheduler, distance_xz
+
+AGENTS = 2000
+FRAMES = 240
+DT = 1 / 60
+
+
+class Agent:
+    def __init__(self, position):
+        self.position = position
+        self.heading = 0.0
+
+    def think(self, dt: float) -> None:
+        if distance_xz(self.position, (0, 0, 0)) > 40:
+            return
+        self.heading = math.degrees(math.atan2(-self.position[0], -self.position[2]))
+        sum(math.sin(i * self.heading) for i in range(30))
+
+
+def every_frame(agents) -> float:
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for agent in agents:
+            agent.think(DT)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def scheduled(agents, budget: float) -> float:
+    scheduler = ThinkScheduler(focus=lambda: (0, 0, 0), budget=budget)
+    for agent in agents:
+        scheduler.add(agent)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        scheduler.update(DT)
+    return (time.perf_counter() - start) / FRAMES
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    agents = [Agent((random.uniform(-80, 80), 0, random.uniform(-80, 80))) for _ in range(AGENTS)]
+    print(f'{AGENTS} agents within 80 units, {FRAMES} frames')
+    print(f'{"every agent, every frame":<28} {every_frame(agents) * 1e3:8.2f} ms/frame')
+    for name, budget in (('scheduled, no budget', math.inf), ('scheduled, 2 ms budget', .002)):
+        print(f'{name:<28} {scheduled(agents, budget) * 1e3:8.2f} ms/frame')
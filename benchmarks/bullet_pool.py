@@ -0,0 +1,45 @@
+# Cost of firing one shot: a new bullet Entity with a tween and a scheduled
+# destroy(), as shoot() used to do, against BulletPool.fire().
+#
+#   python benchmarks/bullet_pool.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from bullet_pool import BulletPool
+
+app = Ursina(window_type='offscreen')
+
+SHOTS = 500
+
+gun = Entity(model='cube', scale=(.3, .2, 1))
+pool = BulletPool(size=64)
+
+
+def new_entity() -> None:
+    for _ in range(SHOTS):
+        bullet = Entity(parent=gun, model='cube', scale=.1, color=color.black)
+        bullet.world_parent = scene
+        bullet.animate_position(bullet.position + gun.forward * 50, curve=curve.linear, duration=1)
+        destroy(bullet, delay=1)
+    for _ in range(70):   # let the tweens and destroys run out
+        app.step()
+
+
+def pooled() -> None:
+    for _ in range(SHOTS):
+        pool.fire(gun.world_position, gun.forward)
+    for _ in range(70):
+        app.step()
+
+
+if __name__ == '__main__':
+    print(f'{SHOTS} shots, then 70 frames')
+    for name, run in (('new Entity + tween + destroy', new_entity),
+                      ('BulletPool.fire', pooled)):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f'{name:<30} {seconds / SHOTS * 1e6:8.1f} us/shot')
@@ -0,0 +1,58 @@
+# Worst frame-thread time when a burst of button presses lands in one frame:
+# callbacks run inline, against a CallbackDispatcher that spreads them over a
+# per-frame budget and runs the one marked heavy() on its thread pool.
+#
+#   python benchmarks/button_callbacks.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from callback_dispatcher import CallbackDispatcher, heavy
+from input_core import InputCore
+
+FRAMES = 30
+PRESSES = 8          # presses of each button in the burst
+BUDGET = .004
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def effect(key: str) -> None:
+    busy(.0015)      # spawning an effect, updating the HUD
+
+
+def save(key: str) -> None:
+    time.sleep(.05)  # writing a save file
+
+
+def run(dispatcher) -> float:
+    core = InputCore(dispatcher=dispatcher)
+    core.register_button_press_callback('gamepad a', effect)
+    core.register_button_press_callback('gamepad b', heavy(save) if dispatcher else save)
+    worst = 0.0
+    for frame in range(FRAMES):
+        start = time.perf_counter()
+        if dispatcher:
+            dispatcher.update()
+        if frame == 0:
+            for _ in range(PRESSES):
+                core.press('gamepad a')
+                core.release('gamepad a')
+            core.press('gamepad b')
+        worst = max(worst, time.perf_counter() - start)
+        time.sleep(1 / 60)
+    if dispatcher:
+        dispatcher.shutdown()
+    return worst
+
+
+if __name__ == '__main__':
+    print(f'worst frame, inline:     {run(None) * 1000:8.3f} ms')
+    print(f'worst frame, dispatcher: {run(CallbackDispatcher(BUDGET)) * 1000:8.3f} ms  (budget {BUDGET * 1000:g} ms)')
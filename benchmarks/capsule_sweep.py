@@ -0,0 +1,65 @@
+# Compares the cost of one movement query in FirstPersonController:
+# the two feet/head raycasts (through ursina and through ColliderIndex)
+# against a single ColliderIndex.sweep_capsule(), in a level with many boxes.
+#
+#   python benchmarks/capsule_sweep.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from collision_index import ColliderIndex
+
+app = Ursina(window_type='offscreen')
+
+COLLIDERS = 2000
+QUERIES = 2000
+
+random.seed(0)
+ground = Entity(model='plane', scale=(200, 1, 200), collider='box')
+level = [ground] + [
+    Entity(model='cube', collider='box',
+           position=(random.uniform(-100, 100), 0, random.uniform(-100, 100)),
+           rotation_y=random.uniform(0, 90),
+           scale=(random.uniform(.5, 4), random.uniform(1, 5), random.uniform(.5, 4)))
+    for _ in range(COLLIDERS)
+]
+index = ColliderIndex(cell_size=4)
+index.add_entities(level)
+
+height = 2
+queries = []
+for _ in range(QUERIES):
+    position = Vec3(random.uniform(-100, 100), 0, random.uniform(-100, 100))
+    direction = Vec3(random.uniform(-1, 1), 0, random.uniform(-1, 1)).normalized()
+    queries.append((position, direction))
+
+
+def two_rays_ursina() -> None:
+    for position, direction in queries:
+        raycast(position + Vec3(0, .5, 0), direction, distance=.5)
+        raycast(position + Vec3(0, height - .1, 0), direction, distance=.5)
+
+
+def two_rays_index() -> None:
+    for position, direction in queries:
+        index.raycast(position + Vec3(0, .5, 0), direction, distance=.5)
+        index.raycast(position + Vec3(0, height - .1, 0), direction, distance=.5)
+
+
+def capsule_sweep() -> None:
+    for position, direction in queries:
+        index.sweep_capsule(position + Vec3(0, 1.25, 0), .25, .5, direction * (5 / 60))
+
+
+if __name__ == '__main__':
+    print(f'{COLLIDERS} colliders, {QUERIES} movement queries')
+    for name, run in (('two rays (ursina raycast)', two_rays_ursina),
+                      ('two rays (ColliderIndex)', two_rays_index),
+                      ('capsule sweep (ColliderIndex)', capsule_sweep)):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f'{name:<32} {seconds / QUERIES * 1e6:8.1f} us/query')
@@ -0,0 +1,82 @@
+# Worst frame time while a button starts a long flow: a request to a local
+# stand-in server followed by staged loading. As a plain callback the flow
+# blocks the press; as an async def callback it is stepped by
+# InputCore.update_coroutines() a little every frame.
+#
+#   python benchmarks/coroutine_callbacks.py
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coroutine_runner import next_frame
+from input_core import InputCore
+
+LATENCY = .05        # the stand-in server's response time
+STAGES = 20
+STAGE_COST = .001    # CPU work per loading stage
+FRAMES = 90
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def blocking_flow(key: str) -> None:
+    with socket.create_connection(('127.0.0.1', PORT)) as connection:
+        connection.sendall(b'level\n')
+        connection.makefile().readline()
+    for _ in range(STAGES):
+        busy(STAGE_COST)
+
+
+async def async_flow(key: str) -> None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', PORT)
+    writer.write(b'level\n')
+    await reader.readline()
+    writer.close()
+    for _ in range(STAGES):
+        busy(STAGE_COST)
+        await next_frame()
+
+
+async def serve(reader, writer) -> None:
+    line = await reader.readline()
+    await asyncio.sleep(LATENCY)
+    writer.write(line)
+    await writer.drain()
+    writer.close()
+
+
+def run(flow, core: InputCore) -> float:
+    core.register_button_press_callback('gamepad a', flow)
+    worst = 0.0
+    for frame in range(FRAMES):
+        start = time.perf_counter()
+        core.update_coroutines()
+        if frame == 0:
+            core.press('gamepad a')
+        worst = max(worst, time.perf_counter() - start)
+        time.sleep(1 / 60)
+    return worst
+
+
+def start_server() -> int:
+    """The stand-in server, on its own event loop in a daemon thread; returns its port."""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(serve, '127.0.0.1', 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+if __name__ == '__main__':
+    PORT = start_server()
+    print(f'worst frame, blocking callback: {run(blocking_flow, InputCore()) * 1000:8.3f} ms')
+    print(f'worst frame, async callback:    {run(async_flow, InputCore()) * 1000:8.3f} ms')
@@ -0,0 +1,65 @@
+# Scene-graph work per face turn of an NxN cube, without the animation: the
+# old rotate_side() scanned every cubie entity's position to find the slice
+# and reparented every cubie back afterwards; with CubeModel's slice index
+# only the turning slice's entities are touched.
+#
+#   python benchmarks/cube_layers.py
+
+import os
+import random
+import sys
+import time as stopwatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from cube_model import CubeModel
+
+app = Ursina(window_type='offscreen', size=(320, 240))
+
+MOVES = 200
+
+
+def build(size: int):
+    model = CubeModel(size)
+    return model, [Entity(position=model.position(i)) for i in range(len(model))]
+
+
+def scanned(size: int, moves) -> float:
+    model, cubes = build(size)
+    helper = Entity()
+    start = stopwatch.perf_counter()
+    for axis, layer, turns in moves:
+        value = layer - (size - 1) / 2
+        for e in [e for e in cubes if abs(e.position[axis] - value) < .1]:
+            e.world_parent = helper
+        setattr(helper, 'rotation_' + 'xyz'[axis], 90 * turns)
+        for e in cubes:
+            e.world_parent = scene
+        helper.rotation = (0, 0, 0)
+    return (stopwatch.perf_counter() - start) / len(moves)
+
+
+def indexed(size: int, moves) -> float:
+    model, cubes = build(size)
+    helper = Entity()
+    start = stopwatch.perf_counter()
+    for axis, layer, turns in moves:
+        moved = [cubes[i] for i in model.rotate(axis, layer, turns)]
+        for e in moved:
+            e.world_parent = helper
+        setattr(helper, 'rotation_' + 'xyz'[axis], 90 * turns)
+        for e in moved:
+            e.world_parent = scene
+        helper.rotation = (0, 0, 0)
+    return (stopwatch.perf_counter() - start) / len(moves)
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    print(f'{MOVES} random outer-face turns')
+    for size in (3, 6, 10):
+        moves = [(random.randrange(3), random.choice((0, size - 1)), random.choice((-1, 1)))
+                 for _ in range(MOVES)]
+        print(f'{size:>2}x{size:<2} scan {scanned(size, moves) * 1e3:7.2f} ms/turn   '
+              f'index {indexed(size, moves) * 1e3:7.2f} ms/turn')
@@ -0,0 +1,54 @@
+# Frame time and scene size for NxN cubes: one Entity with its own copy of
+# the cubie mesh per cubie, as cube.py used to build them, against
+# CubieRenderer's single instanced draw call. Rendered offscreen, so absolute
+# numbers depend on the GPU driver.
+#
+#   python benchmarks/cube_rendering.py
+
+import os
+import sys
+import time as stopwatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from cube_model import CubeModel
+from cube_renderer import CubieRenderer
+
+app = Ursina(window_type='offscreen', size=(640, 480))
+
+FRAMES = 60
+mesh = load_model('cube')
+
+
+def frame_time() -> float:
+    for _ in range(5):
+        app.step()
+    start = stopwatch.perf_counter()
+    for _ in range(FRAMES):
+        app.step()
+    return (stopwatch.perf_counter() - start) / FRAMES
+
+
+def entities(size: int):
+    state = CubeModel(size)
+    cubes = [Entity(model=copy(mesh), position=state.position(i), texture='white_cube') for i in range(len(state))]
+    result = frame_time(), len(cubes)
+    for e in cubes:
+        destroy(e)
+    return result
+
+
+def instanced(size: int):
+    renderer = CubieRenderer(CubeModel(size), model=mesh)
+    result = frame_time(), 1
+    destroy(renderer)
+    return result
+
+
+if __name__ == '__main__':
+    for size in (3, 10, 20):
+        camera.position = (0, 0, -size * 3.5)
+        (per_entity, nodes), (shared, draws) = entities(size), instanced(size)
+        print(f'{size:>2}x{size:<2} entities {per_entity * 1e3:7.2f} ms/frame ({nodes} meshes)   '
+              f'instanced {shared * 1e3:7.2f} ms/frame ({draws} mesh)')
@@ -0,0 +1,51 @@
+# Scramble cost: turning a cube's entities once per move with speed=0, as
+# randomize() used to, against applying the moves to CubeModel alone and
+# placing every entity once at the end.
+#
+#   python benchmarks/cube_scramble.py
+
+import os
+import random
+import sys
+import time as stopwatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from cube_model import CubeModel
+
+app = Ursina(window_type='offscreen', size=(320, 240))
+
+
+def per_move(size: int, moves) -> float:
+    model = CubeModel(size)
+    cubes = [Entity(position=model.position(i)) for i in range(len(model))]
+    helper = Entity()
+    start = stopwatch.perf_counter()
+    for axis, layer, turns in moves:
+        moved = [cubes[i] for i in model.rotate(axis, layer, turns)]
+        for e in moved:
+            e.world_parent = helper
+        helper.animate('rotation_' + 'xyz'[axis], 90 * turns, duration=0)
+        for e in moved:
+            e.world_parent = scene
+        helper.rotation = (0, 0, 0)
+    return stopwatch.perf_counter() - start
+
+
+def state_only(size: int, moves) -> float:
+    model = CubeModel(size)
+    cubes = [Entity(position=model.position(i)) for i in range(len(model))]
+    start = stopwatch.perf_counter()
+    model.apply(moves)
+    for i, e in enumerate(cubes):
+        e.position = model.position(i)
+    return stopwatch.perf_counter() - start
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    for size, count in ((3, 20), (3, 1000), (3, 10000), (10, 1000)):
+        moves = CubeModel(size).random_moves(count)
+        print(f'{size:>2}x{size:<2} {count:>5} moves   per move {per_move(size, moves) * 1e3:9.2f} ms   '
+              f'state only {state_only(size, moves) * 1e3:7.2f} ms')
@@ -0,0 +1,48 @@
+# CubeSolver costs: building the pruning tables from scratch, loading them
+# memory-mapped from the cache, and solving random 3x3 scrambles.
+#
+#   python benchmarks/cube_solver.py
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cube_model import CubeModel
+from cube_solver import CubeSolver
+
+SCRAMBLES = 50
+SCRAMBLE_LENGTH = 40
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        CubeSolver(cache_dir)
+        print(f'build tables      {time.perf_counter() - start:8.2f} s')
+        start = time.perf_counter()
+        solver = CubeSolver(cache_dir)
+        print(f'load tables       {time.perf_counter() - start:8.2f} s')
+
+        rng = random.Random(0)
+        for max_length in (24, 22, 21):
+            times, lengths, failed = [], [], 0
+            for _ in range(SCRAMBLES):
+                model = CubeModel(3)
+                model.apply(model.random_moves(SCRAMBLE_LENGTH, rng))
+                start = time.perf_counter()
+                moves = solver.solve(model, max_length=max_length, timeout=10)
+                times.append(time.perf_counter() - start)
+                if moves is None:
+                    failed += 1
+                    continue
+                model.apply(moves)
+                assert model.solved
+                lengths.append(len(moves))
+            print(f'max {max_length} moves      median {statistics.median(times) * 1e3:7.1f} ms   '
+                  f'max {max(times) * 1e3:7.1f} ms   mean length {statistics.mean(lengths):5.2f}   '
+                  f'{failed} of {SCRAMBLES} timed out')
@@ -0,0 +1,63 @@
+# Frame time with many enemies on screen: one cube Entity plus a health-bar
+# child per enemy, as fps.py used to spawn them, against UnitRenderer's two
+# instanced draw calls. Rendered offscreen, so absolute numbers depend on
+# the GPU driver.
+#
+#   python benchmarks/enemy_rendering.py
+
+import os
+import sys
+import time as stopwatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from instancing import UnitRenderer
+
+app = Ursina(window_type='offscreen', size=(640, 480))
+
+FRAMES = 60
+camera.position = (0, 60, -60)
+camera.rotation_x = 45
+
+
+def grid(count: int):
+    side = int(count ** .5) + 1
+    return [((i % side) * 2 - side, 0, (i // side) * 2 - side) for i in range(count)]
+
+
+def frame_time() -> float:
+    for _ in range(5):
+        app.step()
+    start = stopwatch.perf_counter()
+    for _ in range(FRAMES):
+        app.step()
+    return (stopwatch.perf_counter() - start) / FRAMES
+
+
+def entities(count: int) -> float:
+    enemies = []
+    for position in grid(count):
+        enemy = Entity(model='cube', scale_y=2, origin_y=-.5, color=color.light_gray, position=position)
+        Entity(parent=enemy, y=1.2, model='cube', color=color.red, world_scale=(1.5, .1, .1))
+        enemies.append(enemy)
+    seconds = frame_time()
+    for enemy in enemies:
+        destroy(enemy)
+    return seconds
+
+
+def instanced(count: int) -> float:
+    renderer = UnitRenderer(capacity=count)
+    for i, position in enumerate(grid(count)):
+        renderer.add(i, position, 0)
+        renderer.set_bar(i, 1, 1)
+    seconds = frame_time()
+    destroy(renderer)
+    return seconds
+
+
+if __name__ == '__main__':
+    print('ms per frame')
+    for count in (100, 1000, 3000):
+        print(f'{count:>5} enemies   entities {entities(count) * 1e3:8.2f}   UnitRenderer {instanced(count) * 1e3:8.2f}')
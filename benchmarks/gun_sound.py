@@ -0,0 +1,43 @@
+# Main-thread cost of one gunshot sound: ursfx() against SoundCache.play()
+# with the variants already rendered on the worker thread.
+#
+#   python benchmarks/gun_sound.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from ursina.prefabs.ursfx import ursfx
+from sound_cache import SoundCache
+
+app = Ursina(window_type='offscreen')
+
+SHOTS = 200
+
+volume_curve = [(0.0, 0.0), (0.1, 0.9), (0.15, 0.75), (0.3, 0.14), (0.6, 0.0)]
+gun_sound = dict(volume=0.5, wave='noise', pitch_change=-12, speed=3.0)
+cache = SoundCache(max_variants=8)
+
+
+def uncached() -> None:
+    for _ in range(SHOTS):
+        ursfx(volume_curve, pitch=random.uniform(-13, -12), **gun_sound)
+
+
+def cached() -> None:
+    for _ in range(SHOTS):
+        cache.play(volume_curve, pitch=random.uniform(-13, -12), **gun_sound)
+
+
+if __name__ == '__main__':
+    for pitch in (-13, -12.75, -12.5, -12.25, -12):
+        cache.prefetch(volume_curve, pitch=pitch, **gun_sound)
+    for future in list(cache._pending.values()):
+        future.result()
+    for name, run in (('ursfx()', uncached), ('SoundCache.play()', cached)):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f'{name:<20} {seconds / SHOTS * 1e6:8.1f} us/shot')
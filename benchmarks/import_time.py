@@ -0,0 +1,37 @@
+# Measures the cold import time of the window-free input core against a plain
+# `from ursina import *`, each in a fresh interpreter, and checks that
+# importing input_manager neither loads ursina nor opens a window.
+#
+#   python benchmarks/import_time.py
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 7
+
+PROBE = '''
+import sys, time
+t = time.perf_counter()
+{statement}
+print(time.perf_counter() - t, 'ursina' in sys.modules)
+'''
+
+
+def measure(statement: str):
+    samples = []
+    loaded = False
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        seconds, loaded = out.split()[-2:]
+        samples.append(float(seconds))
+    return statistics.median(samples), loaded == 'True'
+
+
+if __name__ == '__main__':
+    for statement in ('import input_manager', 'from ursina import *'):
+        seconds, loaded = measure(statement)
+        print(f'{statement:<24} {seconds * 1000:9.2f} ms  (ursina loaded: {loaded})')
@@ -0,0 +1,33 @@
+# Measures how much InputManager construction costs with eager on-screen
+# controls versus lazy_onscreen_controls=True (controls built on first touch).
+#
+#   python benchmarks/input_manager_startup.py
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from input_manager import InputManager
+
+app = Ursina(window_type='offscreen')
+
+ROUNDS = 50
+
+
+def construct(lazy: bool) -> None:
+    manager = InputManager(enable_onscreen_controls=True, lazy_onscreen_controls=lazy)
+    for control in (manager.joystick_left, manager.joystick_right, *manager.buttons):
+        if control:
+            destroy(control)
+
+
+if __name__ == '__main__':
+    construct(False)  # warm the model/texture caches so both runs pay the same
+    eager = timeit.timeit(lambda: construct(False), number=ROUNDS) / ROUNDS
+    lazy = timeit.timeit(lambda: construct(True), number=ROUNDS) / ROUNDS
+    print(f'eager construction: {eager * 1000:8.3f} ms')
+    print(f'lazy construction:  {lazy * 1000:8.3f} ms')
+    print(f'saved at startup:   {(eager - lazy) * 1000:8.3f} ms')
@@ -0,0 +1,73 @@
+# Per-frame cost of keeping many bullets in flight: BulletPool (one Entity
+# per bullet, no collision) against ProjectileSystem (NumPy arrays, batched
+# collision against a ColliderIndex, one instanced draw).
+#
+#   python benchmarks/projectiles.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from ursina import *
+from bullet_pool import BulletPool
+from collision_index import ColliderIndex
+from projectile_system import ProjectileSystem
+
+app = Ursina(window_type='offscreen')
+
+COLLIDERS = 500
+FRAMES = 20
+
+random.seed(0)
+level = [
+    Entity(model='cube', collider='box',
+           position=(random.uniform(-100, 100), 0, random.uniform(-100, 100)),
+           rotation_y=random.uniform(0, 90),
+           scale=(random.uniform(.5, 4), random.uniform(1, 5), random.uniform(.5, 4)))
+    for _ in range(COLLIDERS)
+]
+index = ColliderIndex(cell_size=4)
+index.add_entities(level)
+
+
+def volley(count: int):
+    rng = np.random.default_rng(0)
+    positions = rng.uniform((-100, 0, -100), (100, 3, 100), (count, 3))
+    directions = rng.normal(size=(count, 3)) * (1, 0, 1)
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    return positions, directions * 50
+
+
+def run_pool(count: int) -> float:
+    pool = BulletPool(size=count, lifetime=100)
+    positions, velocities = volley(count)
+    for position, velocity in zip(positions, velocities):
+        pool.fire(Vec3(*position), Vec3(*velocity))
+    seconds = min(timeit.repeat(pool.update, number=FRAMES, repeat=3)) / FRAMES
+    destroy(pool)
+    return seconds
+
+
+def run_system(count: int) -> float:
+    system = ProjectileSystem(index, capacity=count, lifetime=100)
+    positions, velocities = volley(count)
+
+    def frame() -> None:
+        if system.count < count:   # refill whatever hit something
+            system.fire_many(positions[:count - system.count], velocities[:count - system.count])
+        system.update()
+
+    seconds = min(timeit.repeat(frame, number=FRAMES, repeat=3)) / FRAMES
+    destroy(system)
+    return seconds
+
+
+if __name__ == '__main__':
+    time.dt = 1 / 60
+    print(f'{COLLIDERS} colliders, ms per frame of simulation (pool has no collision)')
+    for count in (100, 1000, 5000):
+        print(f'{count:>5} bullets   BulletPool {run_pool(count) * 1e3:8.2f}   ProjectileSystem {run_system(count) * 1e3:8.2f}')
@@ -0,0 +1,65 @@
+# Compares per-ray queries against one RayBatch.resolve() for a frame's worth
+# of enemy line-of-sight rays: ursina raycast(), ColliderIndex.raycast() and
+# the batched traversal.
+#
+#   python benchmarks/ray_batch.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ursina import *
+from collision_index import ColliderIndex
+from ray_batch import RayBatch
+
+app = Ursina(window_type='offscreen')
+
+COLLIDERS = 2000
+RAYS = 500
+
+random.seed(0)
+ground = Entity(model='plane', scale=(200, 1, 200), collider='box')
+level = [ground] + [
+    Entity(model='cube', collider='box',
+           position=(random.uniform(-100, 100), 0, random.uniform(-100, 100)),
+           rotation_y=random.uniform(0, 90),
+           scale=(random.uniform(.5, 4), random.uniform(1, 5), random.uniform(.5, 4)))
+    for _ in range(COLLIDERS)
+]
+index = ColliderIndex(cell_size=4)
+index.add_entities(level)
+batch = RayBatch(index)
+
+rays = []
+for _ in range(RAYS):
+    origin = Vec3(random.uniform(-100, 100), 1, random.uniform(-100, 100))
+    direction = Vec3(random.uniform(-1, 1), 0, random.uniform(-1, 1)).normalized()
+    rays.append((origin, direction))
+
+
+def per_ray_ursina() -> None:
+    for origin, direction in rays:
+        raycast(origin, direction, 30)
+
+
+def per_ray_index() -> None:
+    for origin, direction in rays:
+        index.raycast(origin, direction, 30)
+
+
+def batched() -> None:
+    for origin, direction in rays:
+        batch.submit(origin, direction, 30)
+    batch.resolve()
+
+
+if __name__ == '__main__':
+    print(f'{COLLIDERS} colliders, {RAYS} rays of length 30 per frame')
+    for name, run in (('per ray (ursina raycast)', per_ray_ursina),
+                      ('per ray (ColliderIndex)', per_ray_index),
+                      ('batched (RayBatch)', batched)):
+        seconds = min(timeit.repeat(run, number=1, repeat=3))
+        print(f'{name:<28} {seconds * 1e3:8.2f} ms/frame')
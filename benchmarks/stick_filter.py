@@ -0,0 +1,45 @@
+# Per-sample cost of the One Euro stick filter, and what it does to a thumb
+# held still (jitter) and to a fast flick (lag), against the raw stick value.
+#
+#   python benchmarks/stick_filter.py
+
+import os
+import random
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from one_euro import StickFilter
+
+DT = 1 / 60
+SAMPLES = 100_000
+NOISE = .02   # standard deviation of the knob position, in stick units
+FLICK = 5     # stick units per second
+
+
+def held(filter, rng):
+    """Output spread with the thumb resting at half deflection."""
+    out = [filter((.5 + rng.gauss(0, NOISE), .5 + rng.gauss(0, NOISE)), DT)[0] for _ in range(300)]
+    return statistics.pstdev(out[60:])
+
+
+def flick(filter):
+    """Largest distance behind the stick while it sweeps 0.2 -> 1 and settles."""
+    lag = 0
+    for i in range(60):
+        target = min(.2 + i * DT * FLICK, 1)
+        lag = max(lag, target - filter((target, 0), DT)[0])
+    return lag
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    filter = StickFilter()
+    values = [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(1000)]
+    cost = timeit.timeit(lambda: [filter(v, DT) for v in values], number=SAMPLES // 1000) / SAMPLES
+
+    print(f'cost per 2-axis sample: {cost * 1e6:8.3f} us')
+    print(f'jitter at rest:         {NOISE:8.4f} raw  {held(StickFilter(), rng):8.4f} filtered')
+    print(f'max lag on a flick:     {0:8.4f} raw  {flick(StickFilter()):8.4f} filtered')
@@ -0,0 +1,76 @@
+# Proximity queries over many entities: a linear scan with a distance per
+# entity against TargetIndex's grid, for "who is within r", "who is nearest"
+# and "who is inside this view cone" around random query points.
+#
+#   python benchmarks/target_queries.py
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from target_index import TargetIndex
+
+ENTITIES = 5000
+QUERIES = 1000
+RADIUS = 10
+CONE = 5
+
+
+class Target:
+    def __init__(self, position):
+        self.world_position = position
+
+
+def scan_radius(targets, center):
+    return [t for t in targets if math.dist(t.world_position, center) <= RADIUS]
+
+
+def scan_nearest(targets, center):
+    return min(targets, key=lambda t: math.dist(t.world_position, center))
+
+
+def scan_cone(targets, center, direction):
+    limit = math.cos(math.radians(CONE))
+    found = []
+    for t in targets:
+        offset = [t.world_position[i] - center[i] for i in range(3)]
+        length = math.hypot(*offset)
+        if 0 < length <= 100 and sum(offset[i] * direction[i] for i in range(3)) / length >= limit:
+            found.append(t)
+    return found
+
+
+def timed(function, queries) -> float:
+    start = time.perf_counter()
+    for args in queries:
+        function(*args)
+    return (time.perf_counter() - start) / len(queries)
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    targets = [Target((random.uniform(-200, 200), random.uniform(0, 4), random.uniform(-200, 200)))
+               for _ in range(ENTITIES)]
+    index = TargetIndex(cell_size=8)
+    index.add_entities(targets)
+    points = [(random.uniform(-200, 200), 1, random.uniform(-200, 200)) for _ in range(QUERIES)]
+    directions = []
+    for _ in range(QUERIES):
+        angle = random.uniform(0, math.tau)
+        directions.append((math.sin(angle), 0, math.cos(angle)))
+
+    print(f'{ENTITIES} entities over 400x400 units, {QUERIES} queries')
+    rows = (
+        (f'radius {RADIUS}', scan_radius, lambda c: index.query_radius(c, RADIUS), [(p,) for p in points]),
+        ('nearest', scan_nearest, index.nearest, [(p,) for p in points]),
+        (f'cone {CONE} deg, 100 units', scan_cone, lambda c, d: index.query_cone(c, d, CONE, 100),
+         list(zip(points, directions))),
+    )
+    for name, scan, query, queries in rows:
+        scanned = timed(lambda *args: scan(targets, *args), queries)
+        indexed = timed(query, queries)
+        print(f'{name:<24} scan {scanned * 1e6:8.1f} us   index {indexed * 1e6:8.1f} us')
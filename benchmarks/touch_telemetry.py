@@ -0,0 +1,48 @@
+# Frame-thread cost of touch telemetry: recording a touch, and flushing the
+# heatmaps with TouchTelemetry.flush() (snapshot here, write on the worker)
+# against serializing and writing them inside the frame.
+#
+#   python benchmarks/touch_telemetry.py
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from touch_telemetry import TouchTelemetry
+
+CONTROLS = ['screen', 'left_stick', 'right_stick', 'gamepad a', 'gamepad b', 'gamepad x', 'gamepad y']
+BINS = 64
+TOUCHES = 100_000
+FLUSHES = 20
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    folder = tempfile.TemporaryDirectory()
+    telemetry = TouchTelemetry(os.path.join(folder.name, 'touches.json'), bins=BINS)
+    touches = [(rng.choice(CONTROLS), rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(TOUCHES)]
+
+    start = time.perf_counter()
+    for control, x, y in touches:
+        telemetry.record(control, x, y)
+    record = (time.perf_counter() - start) / TOUCHES
+
+    in_frame = background = 0.0
+    for _ in range(FLUSHES):
+        start = time.perf_counter()
+        telemetry._write(telemetry._snapshot())
+        in_frame += time.perf_counter() - start
+
+        start = time.perf_counter()
+        future = telemetry.flush()
+        background += time.perf_counter() - start
+        future.result()
+    telemetry.close()
+
+    print(f'record one touch:          {record * 1e6:8.3f} us')
+    print(f'flush, written in frame:   {in_frame / FLUSHES * 1000:8.3f} ms')
+    print(f'flush, written on worker:  {background / FLUSHES * 1000:8.3f} ms on the frame thread')
@@ -0,0 +1,81 @@
+# Preallocated bullet and tracer entities. Shooting reuses disabled entities
+# from a fixed pool instead of creating an Entity, a tween and a destroy()
+# per shot; each pool moves and expires its live entities in one update().
+
+from collections import deque
+
+from ursina import *
+
+class BulletPool(Entity):
+    """
+    Bullets that fly in a straight line for lifetime seconds and are then
+    recycled. When every bullet is live, firing reuses the oldest one.
+    """
+    def __init__(self, size: int = 32, speed: float = 50, lifetime: float = 1, **kwargs):
+        super().__init__()
+        self.speed = speed
+        self.lifetime = lifetime
+        self.time = 0.0
+        bullet_kwargs = dict(model='cube', scale=.1, color=color.black)
+        bullet_kwargs.update(kwargs)
+        self.bullets = [Entity(parent=self, enabled=False, **bullet_kwargs) for _ in range(size)]
+        self._free = list(self.bullets)
+        self._live = deque()   # [bullet, velocity, expires], oldest first
+
+    def fire(self, position, direction) -> Entity:
+        if self._free:
+            bullet = self._free.pop()
+        else:
+            bullet = self._live.popleft()[0]
+        direction = Vec3(*direction).normalized()
+        bullet.position = position
+        bullet.look_at(bullet.position + direction)
+        bullet.enabled = True
+        self._live.append([bullet, direction * self.speed, self.time + self.lifetime])
+        return bullet
+
+    def update(self) -> None:
+        self.time += time.dt
+        live = self._live
+        # every bullet has the same lifetime, so the oldest expire first
+        while live and live[0][2] <= self.time:
+            bullet = live.popleft()[0]
+            bullet.enabled = False
+            self._free.append(bullet)
+        for bullet, velocity, expires in live:
+            bullet.position += velocity * time.dt
+
+class TracerPool(Entity):
+    """Thin streaks drawn from muzzle to impact for hitscan shots, faded out over duration."""
+    def __init__(self, size: int = 16, duration: float = .05, thickness: float = .02, **kwargs):
+        super().__init__()
+        self.duration = duration
+        self.time = 0.0
+        tracer_kwargs = dict(model='cube', origin_z=-.5, scale=(thickness, thickness, 1), color=color.yellow)
+        tracer_kwargs.update(kwargs)
+        self.tracers = [Entity(parent=self, enabled=False, **tracer_kwargs) for _ in range(size)]
+        self._free = list(self.tracers)
+        self._live = deque()   # [tracer, expires], oldest first
+
+    def show(self, start, end) -> Entity:
+        if self._free:
+            tracer = self._free.pop()
+        else:
+            tracer = self._live.popleft()[0]
+        tracer.position = start
+        tracer.look_at(end)
+        tracer.scale_z = distance(start, end)
+        tracer.alpha = 1
+        tracer.enabled = True
+        self._live.append([tracer, self.time + self.duration])
+        return tracer
+
+    def update(self) -> None:
+        self.time += time.dt
+        live = self._live
+        while live and live[0][1] <= self.time:
+            tracer = live.popleft()[0]
+            tracer.enabled = False
+            self._free.append(tracer)
+        for tracer, expires in live:
+            tracer.alpha = (expires - self.time) / self.duration
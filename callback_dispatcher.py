@@ -0,0 +1,116 @@
+# Button callbacks under a frame budget. Callbacks run synchronously while
+# the frame's budget lasts and are timed; one that is expected to overrun
+# what is left, or that arrives once the budget is spent, waits for the next
+# frame, in order. Callbacks wrapped with heavy() run on a thread pool and
+# hand their result back on the main thread from update().
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+class HeavyCallback:
+    """
+    A callback to run off the main thread; see heavy(). Called directly, as
+    buttons without a dispatcher do, it runs inline and still hands its
+    result to on_result.
+    """
+    __slots__ = ('callback', 'on_result')
+
+    def __init__(self, callback: Callable, on_result: Optional[Callable[[Any], None]] = None):
+        self.callback = callback
+        self.on_result = on_result
+
+    def __call__(self, *args):
+        result = self.callback(*args)
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+def heavy(callback: Callable, on_result: Optional[Callable[[Any], None]] = None) -> HeavyCallback:
+    """
+    Mark callback to run on the dispatcher's thread pool, for work such as
+    saving or loading that must not touch the scene. on_result is called on
+    the main thread with its return value.
+    """
+    return HeavyCallback(callback, on_result)
+
+class CallbackDispatcher:
+    """
+    Runs callbacks within budget seconds of main-thread time per frame. Call
+    update() once a frame: it starts a new budget, delivers finished heavy
+    callbacks and runs the deferred ones, at least one per frame. Each
+    callback's duration is kept as a moving average to predict overruns.
+    """
+    def __init__(self, budget: float = .004, max_workers: int = 2):
+        self.budget = budget
+        self.max_workers = max_workers
+        self.durations: Dict[Callable, float] = {}
+        self.deferred: Deque[Tuple[Callable, tuple]] = deque()
+        self._spent = 0.0
+        self._running: List[Tuple[Future, HeavyCallback]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def dispatch(self, callback: Callable, *args) -> None:
+        """Run callback(*args) now, defer it to a later frame or start it on the pool."""
+        if isinstance(callback, HeavyCallback):
+            self._running.append((self._pool().submit(callback.callback, *args), callback))
+        elif self.deferred or not self._fits(callback):
+            self.deferred.append((callback, args))   # keep press/release order
+        else:
+            self._run(callback, args)
+
+    def update(self) -> None:
+        self._spent = 0.0
+        if self._running:
+            self._deliver()
+        deferred = self.deferred
+        if deferred:
+            callback, args = deferred.popleft()
+            self._run(callback, args)
+            while deferred and self._fits(deferred[0][0]):
+                callback, args = deferred.popleft()
+                self._run(callback, args)
+
+    @property
+    def pending(self) -> int:
+        """Deferred callbacks plus heavy ones still running."""
+        return len(self.deferred) + len(self._running)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _fits(self, callback: Callable) -> bool:
+        return self._spent + self.durations.get(callback, 0.0) <= self.budget
+
+    def _run(self, callback: Callable, args: tuple) -> None:
+        start = time.perf_counter()
+        try:
+            callback(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._spent += elapsed
+            average = self.durations.get(callback)
+            self.durations[callback] = elapsed if average is None else average + (elapsed - average) * .25
+
+    def _deliver(self) -> None:
+        running, self._running = self._running, []
+        for i, (future, callback) in enumerate(running):
+            if not future.done():
+                self._running.append((future, callback))
+                continue
+            try:
+                result = future.result()   # re-raises the callback's error here, on the main thread
+                if callback.on_result:
+                    callback.on_result(result)
+            except BaseException:
+                self._running.extend(running[i + 1:])
+                raise
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='button_callbacks')
+        return self._executor
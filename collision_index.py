@@ -0,0 +1,412 @@
+# Broadphase for movement queries. Colliders are bucketed in a uniform spatial
+# hash, so a ray only reaches the narrow-phase test for the few colliders in
+# the cells it crosses instead of traversing the whole scene. The hash and the
+# box math are plain Python; ursina is only touched by ColliderIndex when it
+# reads entity transforms or falls back to raycast() for non-box colliders.
+
+import math
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+Vector = Tuple[float, float, float]
+Cell = Tuple[int, int, int]
+
+_EPSILON = 1e-9
+
+class SpatialHash:
+    """Uniform grid of axis-aligned bounds, keyed by arbitrary hashable keys."""
+    def __init__(self, cell_size: float = 4.0):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[Hashable]] = {}
+        self.bounds: Dict[Hashable, Tuple[Vector, Vector]] = {}
+        self._cells_of: Dict[Hashable, Tuple[Cell, ...]] = {}
+        self._extent: Optional[Tuple[Vector, Vector]] = None   # occupied region, rebuilt lazily
+
+    def _cell_range(self, lo: Vector, hi: Vector) -> Tuple[Cell, ...]:
+        size = self.cell_size
+        x0, y0, z0 = (math.floor(v / size) for v in lo)
+        x1, y1, z1 = (math.floor(v / size) for v in hi)
+        return tuple((x, y, z)
+                     for x in range(x0, x1 + 1)
+                     for y in range(y0, y1 + 1)
+                     for z in range(z0, z1 + 1))
+
+    def insert(self, key: Hashable, lo: Vector, hi: Vector) -> None:
+        self.update(key, lo, hi)
+
+    def update(self, key: Hashable, lo: Vector, hi: Vector) -> None:
+        """Insert key or move it, touching only the cells it enters or leaves."""
+        new_cells = self._cell_range(lo, hi)
+        old_cells = self._cells_of.get(key, ())
+        if new_cells != old_cells:
+            new_set = set(new_cells)
+            for cell in old_cells:
+                if cell not in new_set:
+                    bucket = self.cells[cell]
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.cells[cell]
+            old_set = set(old_cells)
+            for cell in new_cells:
+                if cell not in old_set:
+                    self.cells.setdefault(cell, set()).add(key)
+            self._cells_of[key] = new_cells
+            self._extent = None
+        self.bounds[key] = (lo, hi)
+
+    def remove(self, key: Hashable) -> None:
+        for cell in self._cells_of.pop(key, ()):
+            bucket = self.cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+        self.bounds.pop(key, None)
+        self._extent = None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.bounds
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def query_aabb(self, lo: Vector, hi: Vector) -> Set[Hashable]:
+        """Keys whose bounds overlap the box lo..hi."""
+        found = set()
+        cells = self.cells
+        for cell in self._cell_range(lo, hi):
+            bucket = cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return {key for key in found if _overlaps(self.bounds[key], lo, hi)}
+
+    def query_ray(self, origin: Vector, direction: Vector, distance: float) -> Set[Hashable]:
+        """
+        Keys in the cells crossed by the segment origin + direction * [0, distance].
+        direction must be normalized. Walks the grid cell by cell (3D DDA) and
+        stops at the edge of the occupied region, so long rays stay cheap.
+        """
+        if not self.cells:
+            return set()
+        size = self.cell_size
+        if self._extent is None:
+            keys = self.cells.keys()
+            self._extent = (tuple(min(cell[i] for cell in keys) * size for i in range(3)),
+                            tuple((max(cell[i] for cell in keys) + 1) * size for i in range(3)))
+        span = _clip_segment(origin, direction, distance, *self._extent)
+        if span is None:
+            return set()
+        t_start, t_end = span
+
+        position = [origin[i] + direction[i] * t_start for i in range(3)]
+        cell = [math.floor(position[i] / size) for i in range(3)]
+        step = [0, 0, 0]
+        t_max = [math.inf, math.inf, math.inf]
+        t_delta = [math.inf, math.inf, math.inf]
+        for i in range(3):
+            if direction[i] > _EPSILON:
+                step[i] = 1
+                t_max[i] = t_start + ((cell[i] + 1) * size - position[i]) / direction[i]
+                t_delta[i] = size / direction[i]
+            elif direction[i] < -_EPSILON:
+                step[i] = -1
+                t_max[i] = t_start + (cell[i] * size - position[i]) / direction[i]
+                t_delta[i] = -size / direction[i]
+
+        found = set()
+        cells = self.cells
+        while True:
+            bucket = cells.get((cell[0], cell[1], cell[2]))
+            if bucket:
+                found.update(bucket)
+            axis = 0 if t_max[0] <= t_max[1] and t_max[0] <= t_max[2] else (1 if t_max[1] <= t_max[2] else 2)
+            if t_max[axis] > t_end:
+                return found
+            cell[axis] += step[axis]
+            t_max[axis] += t_delta[axis]
+
+def _overlaps(bounds: Tuple[Vector, Vector], lo: Vector, hi: Vector) -> bool:
+    b_lo, b_hi = bounds
+    return (b_lo[0] <= hi[0] and b_hi[0] >= lo[0]
+            and b_lo[1] <= hi[1] and b_hi[1] >= lo[1]
+            and b_lo[2] <= hi[2] and b_hi[2] >= lo[2])
+
+def _clip_segment(origin: Vector, direction: Vector, distance: float,
+                  lo: Vector, hi: Vector) -> Optional[Tuple[float, float]]:
+    """Parametric range of the segment that lies inside the box lo..hi."""
+    t0, t1 = 0.0, distance
+    for i in range(3):
+        if abs(direction[i]) < _EPSILON:
+            if origin[i] < lo[i] or origin[i] > hi[i]:
+                return None
+            continue
+        inv = 1.0 / direction[i]
+        near = (lo[i] - origin[i]) * inv
+        far = (hi[i] - origin[i]) * inv
+        if near > far:
+            near, far = far, near
+        t0 = max(t0, near)
+        t1 = min(t1, far)
+        if t0 > t1:
+            return None
+    return t0, t1
+
+class OrientedBox:
+    """A box collider in world space: center, three unit axes and half extents."""
+    __slots__ = ('center', 'axes', 'half_extents')
+
+    def __init__(self, center: Vector, axes: Tuple[Vector, Vector, Vector], half_extents: Vector):
+        self.center = center
+        self.axes = axes
+        self.half_extents = half_extents
+
+    def aabb(self) -> Tuple[Vector, Vector]:
+        reach = [sum(abs(self.axes[a][i]) * self.half_extents[a] for a in range(3)) for i in range(3)]
+        return (tuple(self.center[i] - reach[i] for i in range(3)),
+                tuple(self.center[i] + reach[i] for i in range(3)))
+
+    def intersect_ray(self, origin: Vector, direction: Vector, distance: float
+                      ) -> Optional[Tuple[float, Vector]]:
+        """
+        Distance and outward world normal where the ray meets the box, or None.
+        Like ursina's raycast(), a ray starting inside the box hits where it exits.
+        """
+        d = (origin[0] - self.center[0], origin[1] - self.center[1], origin[2] - self.center[2])
+        t_near, t_far = -math.inf, math.inf
+        near_normal = far_normal = None
+        for axis, half in zip(self.axes, self.half_extents):
+            e = axis[0] * d[0] + axis[1] * d[1] + axis[2] * d[2]
+            f = axis[0] * direction[0] + axis[1] * direction[1] + axis[2] * direction[2]
+            if abs(f) < _EPSILON:
+                if e < -half or e > half:
+                    return None
+                continue
+            t1 = (-half - e) / f
+            t2 = (half - e) / f
+            sign = -1.0
+            if t1 > t2:
+                t1, t2 = t2, t1
+                sign = 1.0
+            if t1 > t_near:
+                t_near = t1
+                near_normal = (axis[0] * sign, axis[1] * sign, axis[2] * sign)
+            if t2 < t_far:
+                t_far = t2
+                far_normal = (-axis[0] * sign, -axis[1] * sign, -axis[2] * sign)
+            if t_near > t_far:
+                return None
+        if near_normal is None or t_far < 0:
+            return None
+        if t_near >= 0:
+            return (t_near, near_normal) if t_near <= distance else None
+        return (t_far, far_normal) if t_far <= distance else None
+
+    def inflated(self, radius: float, half_height: float) -> 'OrientedBox':
+        """
+        Conservative Minkowski sum with a vertical capsule: the box grown by
+        radius on every axis plus the capsule's half segment projected on it.
+        Corners stay square, so a capsule is stopped slightly early there.
+        """
+        half_extents = tuple(half + radius + half_height * abs(axis[1])
+                             for axis, half in zip(self.axes, self.half_extents))
+        return OrientedBox(self.center, self.axes, half_extents)
+
+    def intersect_motion(self, origin: Vector, direction: Vector, distance: float
+                         ) -> Optional[Tuple[float, Vector]]:
+        """
+        Like intersect_ray, but a point that starts inside the box is blocked at
+        once by the face it is closest to, and only if it moves into that face.
+        """
+        d = (origin[0] - self.center[0], origin[1] - self.center[1], origin[2] - self.center[2])
+        depth, face = math.inf, None
+        for axis, half in zip(self.axes, self.half_extents):
+            e = axis[0] * d[0] + axis[1] * d[1] + axis[2] * d[2]
+            if e < -half or e > half:
+                break
+            if half - abs(e) < depth:
+                depth = half - abs(e)
+                sign = 1.0 if e >= 0 else -1.0
+                face = (axis[0] * sign, axis[1] * sign, axis[2] * sign)
+        else:
+            if face[0] * direction[0] + face[1] * direction[1] + face[2] * direction[2] < 0:
+                return 0.0, face
+            return None
+        return self.intersect_ray(origin, direction, distance)
+
+class ColliderIndex:
+    """
+    Spatial index over entity colliders that answers ursina-style raycasts.
+
+    Box colliders are tested analytically. Any other collider uses its tight
+    bounds for the broadphase and ursina's raycast() against that entity alone
+    as the narrow phase. Call update(entity) after moving an indexed entity,
+    or add it with dynamic=True and call refresh() once per frame.
+    """
+    def __init__(self, cell_size: float = 4.0):
+        self.hash = SpatialHash(cell_size)
+        self.boxes: Dict[Any, Optional[OrientedBox]] = {}
+        self.dynamic: Dict[Any, Any] = {}
+
+    def add(self, entity, dynamic: bool = False) -> None:
+        self.update(entity)
+        if dynamic:
+            self.dynamic[entity] = _transform_key(entity)
+
+    def add_entities(self, entities: Iterable, dynamic: bool = False) -> None:
+        for entity in entities:
+            if entity.collider:
+                self.add(entity, dynamic=dynamic)
+
+    def remove(self, entity) -> None:
+        self.hash.remove(entity)
+        self.boxes.pop(entity, None)
+        self.dynamic.pop(entity, None)
+
+    def update(self, entity) -> None:
+        box = _oriented_box(entity)
+        if box:
+            lo, hi = box.aabb()
+        else:
+            lo, hi = _tight_bounds(entity)
+        self.boxes[entity] = box
+        self.hash.update(entity, lo, hi)
+
+    def refresh(self) -> None:
+        """Re-index dynamic entities whose transform changed since the last call."""
+        for entity, key in list(self.dynamic.items()):
+            if entity.is_empty():
+                self.remove(entity)
+                continue
+            new_key = _transform_key(entity)
+            if new_key != key:
+                self.dynamic[entity] = new_key
+                self.update(entity)
+
+    def sweep_capsule(self, center, half_height: float, radius: float, motion,
+                      ignore: Iterable = (), max_slides: int = 3, skin: float = 1e-3):
+        """
+        Move a vertical capsule (segment center +- half_height on y, plus radius)
+        by motion and return the displacement it can actually make, sliding
+        along whatever it touches. Does one broadphase query for the whole
+        swept volume; non-box colliders are treated as their bounding box.
+        """
+        from ursina import Vec3
+
+        start = (center[0], center[1], center[2])
+        remaining = [motion[0], motion[1], motion[2]]
+        reach = (radius + skin, half_height + radius + skin, radius + skin)
+        end = tuple(start[i] + remaining[i] for i in range(3))
+        lo = tuple(min(start[i], end[i]) - reach[i] for i in range(3))
+        hi = tuple(max(start[i], end[i]) + reach[i] for i in range(3))
+
+        candidates = []
+        for entity in self.hash.query_aabb(lo, hi):
+            if entity in ignore or not entity.enabled:
+                continue
+            box = self.boxes[entity] or _aabb_box(*self.hash.bounds[entity])
+            candidates.append(box.inflated(radius, half_height))
+
+        position = list(start)
+        for _ in range(max_slides):
+            length = math.sqrt(remaining[0] ** 2 + remaining[1] ** 2 + remaining[2] ** 2)
+            if length < _EPSILON:
+                break
+            direction = (remaining[0] / length, remaining[1] / length, remaining[2] / length)
+            best = None
+            for box in candidates:
+                result = box.intersect_motion(position, direction, length)
+                if result and (best is None or result[0] < best[0]):
+                    best = result
+            if best is None:
+                for i in range(3):
+                    position[i] += remaining[i]
+                break
+            t, normal = best
+            t = max(0.0, t - skin)
+            for i in range(3):
+                position[i] += direction[i] * t
+                remaining[i] = direction[i] * (length - t)
+            # wall sliding: keep only the part of the leftover motion along the surface
+            into = remaining[0] * normal[0] + remaining[1] * normal[1] + remaining[2] * normal[2]
+            for i in range(3):
+                remaining[i] -= normal[i] * into
+
+        return Vec3(*(position[i] - start[i] for i in range(3)))
+
+    def raycast(self, origin, direction=(0, 0, 1), distance: float = 9999, ignore: Iterable = ()):
+        """Drop-in for ursina's raycast() limited to the indexed colliders."""
+        from ursina import Vec3, raycast, scene
+        from ursina.hit_info import HitInfo
+
+        origin = (origin[0], origin[1], origin[2])
+        length = math.sqrt(direction[0] ** 2 + direction[1] ** 2 + direction[2] ** 2)
+        if length < _EPSILON:
+            return HitInfo(hit=False, distance=distance)
+        direction = (direction[0] / length, direction[1] / length, direction[2] / length)
+
+        best_t, best_normal, best_entity, best_info = math.inf, None, None, None
+        for entity in self.hash.query_ray(origin, direction, distance):
+            if entity in ignore or not entity.enabled:
+                continue
+            box = self.boxes[entity]
+            if box:
+                result = box.intersect_ray(origin, direction, distance)
+                if result and result[0] < best_t:
+                    best_t, best_normal = result
+                    best_entity, best_info = entity, None
+            else:
+                info = raycast(Vec3(*origin), Vec3(*direction), distance, traverse_target=entity, ignore=list(ignore))
+                if info.hit and info.distance < best_t:
+                    best_t, best_normal = info.distance, None
+                    best_entity, best_info = entity, info
+
+        if best_info:
+            return best_info
+        if best_entity is None:
+            return HitInfo(hit=False, distance=distance)
+
+        world_point = Vec3(*(origin[i] + direction[i] * best_t for i in range(3)))
+        world_normal = Vec3(*best_normal)
+        hit_info = HitInfo(hit=True)
+        hit_info.entity = best_entity
+        hit_info.entities = [best_entity]
+        hit_info.world_point = world_point
+        hit_info.point = Vec3(*best_entity.getRelativePoint(scene, world_point))
+        hit_info.distance = best_t
+        hit_info.world_normal = world_normal
+        hit_info.normal = Vec3(*best_entity.getRelativeVector(scene, world_normal)).normalized()
+        return hit_info
+
+def _transform_key(entity) -> Tuple:
+    return tuple(entity.world_position) + tuple(entity.world_rotation) + tuple(entity.world_scale)
+
+def _oriented_box(entity) -> Optional[OrientedBox]:
+    from ursina import scene
+    from ursina.collider import BoxCollider
+
+    collider = entity.collider
+    if not isinstance(collider, BoxCollider):
+        return None
+    center = scene.getRelativePoint(entity, collider.center)
+    axes = []
+    half_extents = []
+    for i, unit in enumerate(((1, 0, 0), (0, 1, 0), (0, 0, 1))):
+        axis = scene.getRelativeVector(entity, unit)
+        scale = axis.length()
+        axes.append(tuple(axis / scale) if scale > _EPSILON else unit)
+        # ursina gives box colliders a minimum half-thickness of 0.001
+        half_extents.append(max(0.001, collider.size[i] / 2) * scale)
+    return OrientedBox(tuple(center), tuple(axes), tuple(half_extents))
+
+def _aabb_box(lo: Vector, hi: Vector) -> OrientedBox:
+    return OrientedBox(tuple((lo[i] + hi[i]) / 2 for i in range(3)),
+                       ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+                       tuple(max(0.001, (hi[i] - lo[i]) / 2) for i in range(3)))
+
+def _tight_bounds(entity) -> Tuple[Vector, Vector]:
+    from ursina import scene
+
+    bounds = entity.getTightBounds(scene)
+    if not bounds:
+        p = tuple(entity.world_position)
+        return p, p
+    lo, hi = bounds
+    return tuple(lo), tuple(hi)
@@ -0,0 +1,88 @@
+# Coroutines stepped from the frame loop. An asyncio event loop is owned here
+# but never left running: update() runs it one iteration at a time until the
+# frame's time slice or iteration count is used up, so `await` on a
+# timer, a socket or another task suspends the flow without blocking a frame
+# and without a thread.
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Coroutine, Dict, Optional, Set
+
+_runners: Dict[asyncio.AbstractEventLoop, 'CoroutineRunner'] = {}
+
+def next_frame() -> Awaitable[None]:
+    """Inside a runner's coroutine, `await next_frame()` resumes in the next update()."""
+    return _runners[asyncio.get_running_loop()].next_frame()
+
+class CoroutineRunner:
+    """
+    Runs coroutines on a private event loop pumped by update(), which runs
+    at most iterations loop iterations and stops starting new ones after
+    time_slice seconds (a single step between awaits can still take longer).
+    The first error raised by a task finishing in an update() is re-raised
+    from it, on the main thread; the others go to the loop's exception
+    handler, which logs them.
+    """
+    def __init__(self, time_slice: float = .002, iterations: int = 8):
+        self.time_slice = time_slice
+        self.iterations = iterations
+        self.loop = asyncio.new_event_loop()
+        self.tasks: Set[asyncio.Task] = set()
+        self._frame: Optional[asyncio.Future] = None
+        _runners[self.loop] = self
+
+    def start(self, coroutine: Coroutine) -> asyncio.Task:
+        """Schedule coroutine; its first step runs in the next update()."""
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        return task
+
+    def starter(self, coroutine_function: Callable[..., Awaitable]) -> Callable[..., None]:
+        """A plain callback that starts coroutine_function(*args) on this runner."""
+        def start(*args) -> None:
+            self.start(coroutine_function(*args))
+        start.__name__ = getattr(coroutine_function, '__name__', 'start')
+        return start
+
+    def next_frame(self) -> asyncio.Future:
+        if self._frame is None:
+            self._frame = self.loop.create_future()
+        return self._frame
+
+    def update(self) -> None:
+        frame, self._frame = self._frame, None
+        if frame:
+            frame.set_result(None)
+        # always at least one iteration, which also serves sockets and servers
+        # opened by tasks that have finished
+        loop = self.loop
+        deadline = time.perf_counter() + self.time_slice
+        for _ in range(self.iterations):
+            loop.call_soon(loop.stop)
+            loop.run_forever()   # one iteration: due timers, ready I/O and callbacks
+            if time.perf_counter() >= deadline or all(task.done() for task in self.tasks):
+                break
+        self._reap()
+
+    def close(self) -> None:
+        """Cancel what is still running and close the loop."""
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+        self.tasks.clear()
+        _runners.pop(self.loop, None)
+        self.loop.close()
+
+    def _reap(self) -> None:
+        finished = [task for task in self.tasks if task.done()]
+        self.tasks.difference_update(finished)
+        failed = [task for task in finished if not task.cancelled() and task.exception() is not None]
+        for task in failed[1:]:
+            self.loop.call_exception_handler({
+                'message': 'Coroutine callback failed in the same frame as another',
+                'exception': task.exception(),
+                'task': task,
+            })
+        if failed:
+            raise failed[0].exception()
@@ -1,7 +1,13 @@
 from ursina import *
 from ursina.prefabs.draggable import Draggable
-import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cube_model import CubeModel
+from cube_renderer import CubieRenderer
+from cube_solver import CubeSolver
+from move_queue import MoveQueue
+from sixDOF_control_scheme import SixDOFController
 
 # ———————————————————————————————————————
 # On-Screen Controls (for 6-DOF camera)
@@ -65,20 +71,14 @@ for i, direction in enumerate((Vec3.right, Vec3.up, Vec3.forward)):
     f2.look_at(-direction, Vec3.up)
 combine_parent.combine()
 
-# place 3×3×3 cubes around origin
-cubes = []
-for x in range(3):
-    for y in range(3):
-        for z in range(3):
-            e = Entity(
-                model=copy(combine_parent.model),
-                position=Vec3(x,y,z) - (Vec3(3,3,3)/3),
-                texture='white_cube'
-            )
-            cubes.append(e)
+# N×N×N cubes around origin: cube_state is the source of truth for where they are,
+# cube_renderer draws them all from the one mesh in a single instanced draw call
+CUBE_SIZE = 3
+cube_state = CubeModel(CUBE_SIZE)
+cube_renderer = CubieRenderer(cube_state, model=combine_parent.model, texture='white_cube')
 
 # face-click collider
-collider = Entity(model='cube', scale=3, collider='box', visible=False)
+collider = Entity(model='cube', scale=CUBE_SIZE, collider='box', visible=False)
 
 def collider_input(key):
     # ignore clicks if interacting with UI
@@ -91,61 +91,96 @@ def collider_input(key):
             rotate_side(mouse.normal, -1)
 collider.input = collider_input
 
-rotation_helper = Entity()
 win_text_entity = Text(y=.35, text='', color=color.green, origin=(0,0), scale=3)
 
-def rotate_side(normal, direction=1, speed=1):
-    # attach correct cubes to pivot
-    if normal == Vec3(1,0,0):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.x > 0]
-        rotation_helper.animate('rotation_x',  90*direction, duration=.15*speed, curve=curve.linear)
-    elif normal == Vec3(-1,0,0):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.x < 0]
-        rotation_helper.animate('rotation_x', -90*direction, duration=.15*speed, curve=curve.linear)
-    elif normal == Vec3(0,1,0):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.y > 0]
-        rotation_helper.animate('rotation_y',  90*direction, duration=.15*speed, curve=curve.linear)
-    elif normal == Vec3(0,-1,0):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.y < 0]
-        rotation_helper.animate('rotation_y', -90*direction, duration=.15*speed, curve=curve.linear)
-    elif normal == Vec3(0,0,1):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.z > 0]
-        rotation_helper.animate('rotation_z', -90*direction, duration=.15*speed, curve=curve.linear)
-    elif normal == Vec3(0,0,-1):
-        [setattr(e, 'world_parent', rotation_helper) for e in cubes if e.z < 0]
-        rotation_helper.animate('rotation_z',  90*direction, duration=.15*speed, curve=curve.linear)
-
-    invoke(reset_rotation_helper, delay=.2*speed)
-    if speed:
-        collider.ignore_input = True
-        @after(.25*speed)
-        def _():
-            collider.ignore_input = False
-            check_for_win()
-
-def reset_rotation_helper():
-    [setattr(e, 'world_parent', scene) for e in cubes]
-    rotation_helper.rotation = (0,0,0)
+def rotate_side(normal, direction=1):
+    # the outer slice on the clicked face, turned about that face's axis
+    axis = max(range(3), key=lambda i: abs(normal[i]))
+    positive = normal[axis] > 0
+    layer = CUBE_SIZE-1 if positive else 0
+    turns = direction * (1 if positive else -1) * (-1 if axis == 2 else 1)
+    move_queue.push((axis, layer, turns))
+
+# every turn, clicked or played back by the solver, is queued and merged here;
+# play_moves() animates them one after another, faster as the queue backs up
+move_queue = MoveQueue()
+turn_time_left = 0
+win_checked = True
+MAX_SPEEDUP = 4      # turns animate up to this much faster when others are waiting
+BATCH_BACKLOG = 30   # with more than a solution's worth waiting, apply them all at once
+
+def play_moves():
+    global turn_time_left, win_checked
+    turn_time_left -= time.dt
+    if turn_time_left > 0:
+        return
+    if len(move_queue) >= BATCH_BACKLOG:
+        cube_state.apply(move_queue)
+        move_queue.clear()
+        cube_renderer.sync()
+    elif move_queue:
+        speed = 1 / min(len(move_queue), MAX_SPEEDUP)
+        turn_slice(*move_queue.pop(), speed=speed)
+        turn_time_left = .2 * speed
+        win_checked = False
+        return
+    if not win_checked:
+        win_checked = True
+        check_for_win()
+
+def turn_slice(axis, layer, turns, speed=1):
+    cube_state.rotate(axis, layer, turns)
+    cube_renderer.turn(axis, layer, turns, duration=.15*speed)
 
 def check_for_win():
-    if {e.world_rotation for e in cubes} == {Vec3(0,0,0)}:
+    if cube_state.solved:
         win_text_entity.text = 'SOLVED!'
         win_text_entity.appear()
     else:
         win_text_entity.text = ''
 
 def randomize():
-    faces = (Vec3(1,0,0),Vec3(0,1,0),Vec3(0,0,1),
-             Vec3(-1,0,0),Vec3(0,-1,0),Vec3(0,0,-1))
-    for i in range(20):
-        rotate_side(random.choice(faces), random.choice((-1,1)), speed=0)
+    # scramble the logical state only, then move every cube into place once
+    move_queue.clear()
+    cube_state.apply(cube_state.random_moves(20))
+    cube_renderer.sync()
+    check_for_win()
 
 Button(text='randomize', color=color.azure, position=(.7,-.4), on_click=randomize).fit_to_text()
 
+# The solver loads its tables from disk, or builds and saves them on a cold
+# cache (several seconds), on a worker thread; solve stays disabled until then.
+solver = None
+solver_loading = None
+solve_button = None
+
+def solve():
+    if solver is None:
+        return
+    # solve the state the queued turns will leave, and queue the solution after them
+    target = cube_state.copy()
+    target.apply(move_queue)
+    for move in solver.solve(target) or ():
+        move_queue.push(move)
+
+def check_solver_ready():
+    global solver, solver_loading
+    if solver_loading and solver_loading.done():
+        solver = solver_loading.result()
+        solver_loading = None
+        solve_button.disabled = False
+        solve_button.text = 'solve'
+        solve_button.fit_to_text()
+
+if CUBE_SIZE == 3:
+    solver_loading = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cube_solver').submit(CubeSolver)
+    solve_button = Button(text='loading solver', color=color.azure, position=(.7,-.32), on_click=solve, disabled=True)
+    solve_button.fit_to_text()
+
 # ———————————————————————————————————————
 # 6-DOF Camera Setup
 # ———————————————————————————————————————
-pivot = Entity()
+pivot = SixDOFController(move_speed=4, rot_speed=100)
 camera.parent   = pivot
 camera.position = Vec3(0,0,-10)
 camera.look_at(Vec3(0,0,0))
@@ -157,38 +192,35 @@ btn_back   = VirtualButton('BACK',       position=(.8, .1),    color=color.red)
 btn_roll_l = VirtualButton('ROLL-LEFT',  position=(.6,-.1),   color=color.cyan)
 btn_roll_r = VirtualButton('ROLL-RIGHT', position=(.8,-.1), color=color.yellow)
 
-move_speed = 4
-rot_speed  = 100
-
 def update():
     # -- Rubik’s-cube face UI should not block camera-UI clicks
     joy_move.update()
     joy_look.update()
 
-    # camera translation
+    # camera translation and rotation, in the pivot's own axes; it integrates them itself
     tx = joy_move.value.x
     ty = joy_move.value.y
     tz = int(btn_fwd.is_pressed) - int(btn_back.is_pressed)
-    pivot.position += Vec3(tx, ty, tz) * time.dt * move_speed
+    pivot.move = Vec3(tx, ty, tz)
 
-    # camera rotation
     yaw   = joy_look.value.x
     pitch = joy_look.value.y
     roll  = int(btn_roll_r.is_pressed) - int(btn_roll_l.is_pressed)
-    pivot.rotation_y += yaw   * time.dt * rot_speed
-    pivot.rotation_x += pitch * time.dt * rot_speed
-    pivot.rotation_z += roll  * time.dt * rot_speed
+    pivot.turn = Vec3(pitch, yaw, roll)
 
     # keep collider at cube origin
     collider.position = Vec3(0,0,0)
 
+    play_moves()
+    check_solver_ready()
+
 # ———————————————————————————————————————
 # Issues to watch for
 # ———————————————————————————————————————
 # 1) UI vs cube input: we filter out clicks when the hovered_entity is under camera.ui,
 #    but Draggable knobs can sometimes still absorb clicks—ensure your UI areas don’t overlap the cube screen projection.
-# 2) Performance: using 27 separate Entities (no instancing) plus animation can be heavier;
-#    if you scale up, consider swapping to instanced Entities with a shared instance_id.
+# 2) Performance: all cubes are one instanced draw call and turns are animated in the shader,
+#    so large CUBE_SIZE costs GPU vertices, not Entities; the state keeps every visible cube.
 # 3) Font glyphs: if you replace 'W/S/Q/E' with arrows, make sure your font supports those unicode chars.
 
 app.run()
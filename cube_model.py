@@ -0,0 +1,193 @@
+# Logical state of an NxN Rubik's cube, separate from the entities that draw
+# it. The state is two arrays: which cubie sits in each slot, and each
+# cubie's orientation as an index into the 24 rotations of a cube. A turn
+# permutes the slots of one slice, found in a precomputed per-slice table,
+# and a running count of misplaced cubies makes the solved check O(1).
+
+import copy
+import random
+from itertools import product
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+Coord = Tuple[int, int, int]
+Move = Tuple[int, int, int]   # axis, layer, quarter turns
+
+def quarter_turn(coord: Coord, axis: int, turns: int) -> Coord:
+    """
+    coord rotated by turns * 90 degrees about axis, in the same sense as
+    ursina's rotation_x / rotation_y / rotation_z.
+    """
+    x, y, z = coord
+    turns %= 4
+    if turns == 2:
+        return (x, -y, -z) if axis == 0 else (-x, y, -z) if axis == 1 else (-x, -y, z)
+    s = 1 if turns == 1 else -1
+    if axis == 0:
+        return (x, -s * z, s * y)
+    if axis == 1:
+        return (s * z, y, -s * x)
+    return (s * y, -s * x, z)
+
+def _quarter_matrix(axis: int) -> np.ndarray:
+    """ursina's rotation matrix for +90 degrees about axis, acting on column vectors."""
+    c, s = 0, 1
+    return np.array((
+        ((1, 0, 0), (0, c, -s), (0, s, c)),
+        ((c, 0, s), (0, 1, 0), (-s, 0, c)),
+        ((c, s, 0), (-s, c, 0), (0, 0, 1)),
+    )[axis], dtype=np.int8)
+
+def _rotation_group() -> np.ndarray:
+    """The 24 rotations of a cube, identity first, as integer 3x3 matrices."""
+    group = [np.eye(3, dtype=np.int8)]
+    for matrix in group:
+        for axis in range(3):
+            turned = _quarter_matrix(axis) @ matrix
+            if not any((turned == known).all() for known in group):
+                group.append(turned)
+    return np.array(group)
+
+ROTATIONS = _rotation_group()
+IDENTITY = 0
+
+def _rotation_index(matrix: np.ndarray) -> int:
+    return int(np.flatnonzero((ROTATIONS == matrix).all(axis=(1, 2)))[0])
+
+# COMPOSE[a, b]: rotation a applied after rotation b
+COMPOSE = np.array([[_rotation_index(a @ b) for b in ROTATIONS] for a in ROTATIONS], dtype=np.int8)
+# QUARTER[axis, turns]: turns quarter turns about axis
+QUARTER = np.array([[_rotation_index(np.linalg.matrix_power(_quarter_matrix(axis), turns))
+                     for turns in range(4)] for axis in range(3)], dtype=np.int8)
+
+FACES = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+# TURNED_FACE[rotation, face]: the face a sticker facing face ends up on
+TURNED_FACE = np.array([[FACES.index(tuple(int(v) for v in matrix @ face)) for face in FACES]
+                        for matrix in ROTATIONS], dtype=np.int8)
+
+class CubeModel:
+    """
+    The visible cubies of a size x size x size cube. Slot i is the grid
+    position cubie i starts in; coordinates are doubled and centred,
+    -(size-1), -(size-3) ... size-1 along each axis, so quarter turns stay
+    exact integers. permutation[slot] is the cubie in a slot, slot_of[cubie]
+    its inverse and orientation[cubie] an index into ROTATIONS. Slices are
+    numbered from the negative side along axis 0 = x, 1 = y, 2 = z.
+
+    A cubie counts as placed when it is in its own slot with its starting
+    orientation. Centre cubies, with a single visible face, only need to be
+    on their own face and facing outwards: their twist cannot be seen, and
+    on larger cubes the centres of a face are interchangeable.
+    """
+    def __init__(self, size: int = 3):
+        self.size = size
+        last = size - 1
+        self.slots: List[Coord] = [
+            (2 * x - last, 2 * y - last, 2 * z - last)
+            for x, y, z in product(range(size), repeat=3)
+            # the core is never seen, so it is not modelled
+            if {0, last} & {x, y, z}
+        ]
+        count = len(self.slots)
+        self.permutation = np.arange(count)
+        self.slot_of = np.arange(count)
+        self.orientation = np.zeros(count, dtype=np.int8)
+        self.misplaced = 0
+
+        # per slice: its slots, and for each number of quarter turns the slots they move to
+        slot_index = {coord: slot for slot, coord in enumerate(self.slots)}
+        self.slices = [[np.array([slot for slot, coord in enumerate(self.slots) if coord[axis] == 2 * layer - last])
+                        for layer in range(size)] for axis in range(3)]
+        self.targets = [[[np.array([slot_index[quarter_turn(self.slots[slot], axis, turns)] for slot in slots])
+                          for turns in range(4)] for slots in self.slices[axis]] for axis in range(3)]
+
+        # the face a centre slot is on, -1 for every other slot
+        self.slot_face = np.full(count, -1, dtype=np.int8)
+        if size > 1:
+            for slot, coord in enumerate(self.slots):
+                outer = [axis for axis in range(3) if abs(coord[axis]) == last]
+                if len(outer) == 1:
+                    face = [0, 0, 0]
+                    face[outer[0]] = 1 if coord[outer[0]] > 0 else -1
+                    self.slot_face[slot] = FACES.index(tuple(face))
+        self.home_face = self.slot_face.copy()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def copy(self) -> 'CubeModel':
+        """A model in the same state that can be turned independently."""
+        model = copy.copy(self)
+        model.permutation = self.permutation.copy()
+        model.slot_of = self.slot_of.copy()
+        model.orientation = self.orientation.copy()
+        return model
+
+    @property
+    def solved(self) -> bool:
+        return self.misplaced == 0
+
+    def position(self, cubie: int) -> Tuple[float, float, float]:
+        """World position of cubie relative to the cube's centre."""
+        x, y, z = self.slots[self.slot_of[cubie]]
+        return (x / 2, y / 2, z / 2)
+
+    def matrix(self, cubie: int) -> np.ndarray:
+        """Rotation of cubie from its starting orientation, acting on column vectors."""
+        return ROTATIONS[self.orientation[cubie]]
+
+    def layer(self, axis: int, layer: int) -> np.ndarray:
+        """The cubies currently in one slice."""
+        return self.permutation[self.slices[axis][layer]]
+
+    def rotate(self, axis: int, layer: int, turns: int = 1) -> np.ndarray:
+        """Turn one slice by turns quarter turns and return the cubies in it."""
+        turns %= 4
+        cubies = self.permutation[self.slices[axis][layer]]
+        if not turns:
+            return cubies
+        before = self._misplaced(cubies)
+        self._turn(cubies, axis, layer, turns)
+        self.misplaced += self._misplaced(cubies) - before
+        return cubies
+
+    def apply(self, moves: Iterable[Move]) -> None:
+        """
+        Apply many moves to the state alone and count misplaced cubies once at
+        the end; sync whatever draws the cube afterwards.
+        """
+        permutation, slices = self.permutation, self.slices
+        for axis, layer, turns in moves:
+            turns %= 4
+            if turns:
+                self._turn(permutation[slices[axis][layer]], axis, layer, turns)
+        self.misplaced = self._misplaced(permutation)
+
+    def random_moves(self, count: int, rng: random.Random = random) -> List[Move]:
+        """count random outer-face turns, never turning the same face twice in a row."""
+        faces = [(axis, layer) for axis in range(3) for layer in sorted({0, self.size - 1})]
+        moves, last = [], None
+        while len(moves) < count:
+            face = rng.choice(faces)
+            if face != last:
+                moves.append((*face, rng.randint(1, 3)))
+                last = face
+        return moves
+
+    def _turn(self, cubies: np.ndarray, axis: int, layer: int, turns: int) -> None:
+        targets = self.targets[axis][layer][turns]
+        self.permutation[targets] = cubies
+        self.slot_of[cubies] = targets
+        self.orientation[cubies] = COMPOSE[QUARTER[axis, turns], self.orientation[cubies]]
+
+    def _misplaced(self, cubies: np.ndarray) -> int:
+        """How many of cubies are not placed."""
+        orientation = self.orientation[cubies]
+        slots = self.slot_of[cubies]
+        face = self.home_face[cubies]
+        placed = np.where(
+            face >= 0,
+            (TURNED_FACE[orientation, np.maximum(face, 0)] == face) & (self.slot_face[slots] == face),
+            (slots == cubies) & (orientation == IDENTITY))
+        return len(cubies) - int(placed.sum())
@@ -0,0 +1,104 @@
+# Instanced drawing for an NxN Rubik's cube. Every cubie shares one mesh and
+# is drawn in a single instanced draw call; each cubie's row in a buffer
+# texture holds its position and rotation from CubeModel. A turning slice is
+# animated by the vertex shader from three uniforms, so a turn uploads the
+# buffer once, when it ends, however large the cube is.
+
+import numpy as np
+from ursina import *
+
+from cube_model import ROTATIONS, CubeModel
+from instancing import InstanceBuffer, InstancedModel
+
+cubie_shader = Shader(name='cubie_shader', language=Shader.GLSL, vertex='''#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instance_data;
+uniform float turn_axis;    // 0, 1, 2 for x, y, z, or -1 when no slice is turning
+uniform float turn_layer;   // the turning slice's coordinate along turn_axis
+uniform float turn_angle;   // radians, in the sense of ursina's rotation_x / _y / _z
+in vec4 p3d_Vertex;
+in vec2 p3d_MultiTexCoord0;
+in vec4 p3d_Color;
+out vec2 texcoords;
+out vec4 vertex_color;
+
+vec3 turn(vec3 v, int axis, float angle) {
+    float c = cos(angle);
+    float s = sin(angle);
+    if (axis == 0) return vec3(v.x, c * v.y - s * v.z, s * v.y + c * v.z);
+    if (axis == 1) return vec3(c * v.x + s * v.z, v.y, -s * v.x + c * v.z);
+    return vec3(c * v.x + s * v.y, -s * v.x + c * v.y, v.z);
+}
+
+void main() {
+    int row = gl_InstanceID * 4;
+    vec3 place = texelFetch(instance_data, row).xyz;
+    mat3 rotation = mat3(texelFetch(instance_data, row + 1).xyz,   // columns
+                         texelFetch(instance_data, row + 2).xyz,
+                         texelFetch(instance_data, row + 3).xyz);
+    vec3 world = rotation * p3d_Vertex.xyz + place;
+    int axis = int(turn_axis);
+    if (axis >= 0 && abs(place[axis] - turn_layer) < .25) {
+        world = turn(world, axis, turn_angle);
+    }
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(world, 1.0);
+    texcoords = p3d_MultiTexCoord0;
+    vertex_color = p3d_Color;
+}
+''',
+fragment='''#version 140
+uniform sampler2D p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+in vec2 texcoords;
+in vec4 vertex_color;
+out vec4 fragColor;
+
+void main() {
+    fragColor = texture(p3d_Texture0, texcoords) * p3d_ColorScale * vertex_color;
+}
+''')
+
+class CubieRenderer(InstancedModel):
+    """
+    Draws every cubie of a CubeModel with one shared cubie mesh. sync()
+    copies the model's state into the instance buffer; turn() animates a
+    slice that has already been turned in the model and syncs at the end.
+    """
+    def __init__(self, state: CubeModel, model='cube', texture='white_cube', **kwargs):
+        super().__init__(model=model, buffer=InstanceBuffer(len(state), texels=4),
+                         shader=cubie_shader, texture=texture, **kwargs)
+        self.state = state
+        self.slots = np.array(state.slots, dtype=np.float32) / 2
+        self._turn_angle = 0
+        self.set_shader_input('turn_axis', -1)
+        self.set_shader_input('turn_layer', 0)
+        self.set_shader_input('turn_angle', 0)
+        self.sync()
+
+    def sync(self) -> None:
+        """Show the model's current state, with no slice turning."""
+        state, rows = self.state, self.buffer.data
+        rows[:, 0, :3] = self.slots[state.slot_of]
+        # rows 1-3 are the rotation's columns
+        rows[:, 1:, :3] = ROTATIONS[state.orientation].transpose(0, 2, 1)
+        self.buffer.upload()
+        self.set_shader_input('turn_axis', -1)
+        self.show_instances(len(state))
+
+    def turn(self, axis: int, layer: int, turns: int, duration: float = .15) -> None:
+        """Animate the slice a model.rotate(axis, layer, turns) call just moved."""
+        self.set_shader_input('turn_axis', axis)
+        self.set_shader_input('turn_layer', layer - (self.state.size - 1) / 2)
+        self.turn_angle = 0
+        self.animate('turn_angle', 90 * turns, duration=duration, curve=curve.linear)
+        invoke(self.sync, delay=duration)
+
+    @property
+    def turn_angle(self) -> float:
+        """The turning slice's angle in degrees."""
+        return self._turn_angle
+
+    @turn_angle.setter
+    def turn_angle(self, value: float) -> None:
+        self._turn_angle = value
+        self.set_shader_input('turn_angle', math.radians(value))
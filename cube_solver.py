@@ -0,0 +1,289 @@
+# Two-phase solver for the 3x3 CubeModel. Phase one turns any state into one
+# reachable with U, D and half turns of the side faces only (corners and edges
+# oriented, middle-layer edges in the middle layer); phase two solves it with
+# those moves. Both phases are IDA* searches over small integer coordinates,
+# guided by pruning tables of exact distances. The tables are built once
+# with vectorized breadth-first searches, saved as .npy files and
+# memory-mapped on later runs.
+
+import math
+import os
+import time
+from itertools import combinations, permutations
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from cube_model import ROTATIONS, CubeModel, Move
+
+TABLE_VERSION = 1
+# the six faces as (axis, layer), opposite faces next to each other; y is the
+# axis phase two turns freely
+FACES = ((0, 0), (0, 2), (1, 0), (1, 2), (2, 0), (2, 2))
+MOVES: List[Move] = [(axis, layer, turns) for axis, layer in FACES for turns in (1, 2, 3)]
+PHASE2_MOVES = [m for m, (axis, layer, turns) in enumerate(MOVES) if axis == 1 or turns == 2]
+
+def _model_slots():
+    model = CubeModel(3)
+    corners = [s for s, coord in enumerate(model.slots) if all(abs(v) == 2 for v in coord)]
+    edges = [s for s, coord in enumerate(model.slots) if sum(abs(v) == 2 for v in coord) == 2]
+    return model.slots, corners, edges
+
+SLOTS, CORNER_SLOTS, EDGE_SLOTS = _model_slots()
+# edges that belong in the middle layer between U and D, and the others
+SLICE_EDGES = [e for e, s in enumerate(EDGE_SLOTS) if SLOTS[s][1] == 0]
+UD_EDGES = [e for e in range(12) if e not in SLICE_EDGES]
+
+def cubie_state(model: CubeModel) -> Tuple[List[int], List[int], List[int], List[int]]:
+    """
+    Corner and edge permutation and orientation of a 3x3 model: which corner
+    (edge) is in each corner (edge) slot, how far its U/D sticker is twisted
+    clockwise from the U/D face, and whether each edge is flipped.
+    """
+    if model.size != 3:
+        raise ValueError('the solver only handles 3x3 cubes')
+    centres = model.slot_face >= 0
+    if (model.permutation[centres] != np.flatnonzero(centres)).any():
+        raise ValueError('centres have moved; only outer faces may be turned')
+    cp, co, ep, eo = [], [], [], []
+    for slot in CORNER_SLOTS:
+        cubie = model.permutation[slot]
+        cp.append(CORNER_SLOTS.index(cubie))
+        sticker = ROTATIONS[model.orientation[cubie]][:, 1] * np.sign(SLOTS[cubie][1])
+        sx, sy, sz = np.sign(SLOTS[slot])
+        clockwise = (1, 0, 2) if sx * sy * sz > 0 else (1, 2, 0)
+        co.append(clockwise.index(int(np.argmax(np.abs(sticker)))))
+    for slot in EDGE_SLOTS:
+        cubie = model.permutation[slot]
+        ep.append(EDGE_SLOTS.index(cubie))
+        # the edge's reference sticker is its U/D one, or its F/B one if it has none
+        reference = 1 if SLOTS[cubie][1] else 2
+        sticker = np.zeros(3, dtype=np.int8)
+        sticker[reference] = np.sign(SLOTS[cubie][reference])
+        axis = int(np.argmax(np.abs(ROTATIONS[model.orientation[cubie]] @ sticker)))
+        eo.append(int(axis != (1 if SLOTS[slot][1] else 2)))
+    return cp, co, ep, eo
+
+def _move_cubies() -> List[Tuple[List[int], List[int], List[int], List[int]]]:
+    """Each move's effect on a solved cube, in cubie_state() form."""
+    effects = []
+    for move in MOVES:
+        model = CubeModel(3)
+        model.rotate(*move)
+        effects.append(cubie_state(model))
+    return effects
+
+MOVE_CUBIES = _move_cubies()
+
+# ——— coordinates ———
+
+def _rank(perms: np.ndarray) -> np.ndarray:
+    """Lexicographic rank of each row, a permutation of 0..n-1."""
+    n = perms.shape[1]
+    smaller_after = (perms[:, None, :] < perms[:, :, None]) & np.triu(np.ones((n, n), dtype=bool), 1)
+    weights = np.array([math.factorial(n - 1 - i) for i in range(n)])
+    return smaller_after.sum(axis=2) @ weights
+
+PERM8 = np.array(list(permutations(range(8))), dtype=np.int8)
+PERM4 = np.array(list(permutations(range(4))), dtype=np.int8)
+COMBOS = np.array(list(combinations(range(12), 4)), dtype=np.int8)
+_COMBO_INDEX = np.zeros(1 << 12, dtype=np.int32)
+_COMBO_INDEX[(1 << COMBOS.astype(np.int64)).sum(axis=1)] = np.arange(len(COMBOS))
+_POW3 = 3 ** np.arange(7)
+_POW2 = 2 ** np.arange(11)
+
+def twist_coord(co) -> np.ndarray:
+    return np.asarray(co)[..., :7] @ _POW3
+
+def flip_coord(eo) -> np.ndarray:
+    return np.asarray(eo)[..., :11] @ _POW2
+
+def slice_coord(ep) -> np.ndarray:
+    """Which four edge slots hold middle-layer edges, as an index into COMBOS."""
+    occupied = np.isin(np.asarray(ep), SLICE_EDGES)
+    return _COMBO_INDEX[occupied @ (1 << np.arange(12))]
+
+def _all_twists() -> np.ndarray:
+    co = (np.arange(3 ** 7)[:, None] // _POW3) % 3
+    return np.hstack([co, (-co.sum(axis=1, keepdims=True)) % 3])
+
+def _all_flips() -> np.ndarray:
+    eo = (np.arange(2 ** 11)[:, None] >> np.arange(11)) & 1
+    return np.hstack([eo, eo.sum(axis=1, keepdims=True) % 2])
+
+def _move_tables() -> dict:
+    """Coordinate after each move, for every coordinate value, as int32 arrays (values x 18)."""
+    twists, flips = _all_twists(), _all_flips()
+    occupancy = np.zeros((len(COMBOS), 12), dtype=bool)
+    occupancy[np.arange(len(COMBOS))[:, None], COMBOS] = True
+    ud_slots = np.array(UD_EDGES)
+    slice_slots = np.array(SLICE_EDGES)
+
+    tables = {name: np.zeros((size, len(MOVES)), dtype=np.int32) for name, size in
+              (('twist', 3 ** 7), ('flip', 2 ** 11), ('slice', len(COMBOS)),
+               ('corners', len(PERM8)), ('ud_edges', len(PERM8)), ('slice_edges', len(PERM4)))}
+    for m, (cp, co, ep, eo) in enumerate(MOVE_CUBIES):
+        cp, co, ep, eo = map(np.array, (cp, co, ep, eo))
+        tables['twist'][:, m] = twist_coord((twists[:, cp] + co) % 3)
+        tables['flip'][:, m] = flip_coord((flips[:, ep] + eo) % 2)
+        moved = occupancy[:, ep]
+        tables['slice'][:, m] = _COMBO_INDEX[moved @ (1 << np.arange(12))]
+        tables['corners'][:, m] = _rank(PERM8[:, cp])
+        if m in PHASE2_MOVES:
+            # phase-two moves keep the U/D edges and the middle-layer edges in their own slots
+            ud_source = np.searchsorted(ud_slots, ep[ud_slots])
+            slice_source = np.searchsorted(slice_slots, ep[slice_slots])
+            tables['ud_edges'][:, m] = _rank(PERM8[:, ud_source])
+            tables['slice_edges'][:, m] = _rank(PERM4[:, slice_source])
+    return tables
+
+def _pruning_table(first: np.ndarray, second: np.ndarray, goal: int, moves: List[int]) -> np.ndarray:
+    """
+    Breadth-first distances over pairs of coordinates, first * len(second) +
+    second, from goal using moves; 255 marks pairs that were never reached.
+    """
+    size = len(second)
+    distance = np.full(len(first) * size, 255, dtype=np.uint8)
+    distance[goal] = 0
+    frontier = np.array([goal])
+    depth = 0
+    while len(frontier):
+        a, b = np.divmod(frontier, size)
+        reached = (first[a][:, moves] * size + second[b][:, moves]).ravel()
+        reached = np.unique(reached[distance[reached] == 255])
+        depth += 1
+        distance[reached] = depth
+        frontier = reached
+    return distance
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'cube_solver'
+
+class CubeSolver:
+    """
+    Two-phase solver. The first CubeSolver() builds its tables (a few
+    seconds) and saves them in cache_dir; later ones memory-map the files.
+    solve() returns CubeModel moves, (axis, layer, quarter turns).
+    """
+    table_names = ('twist', 'flip', 'slice', 'corners', 'ud_edges', 'slice_edges',
+                   'twist_slice', 'flip_slice', 'corners_slice', 'ud_edges_slice')
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.tables = self._load() or self._build()
+        t = self.tables
+        # move tables are small and hit constantly, so search them as lists;
+        # pruning tables stay memory-mapped and are read through memoryviews
+        self.twist_move, self.flip_move, self.slice_move = (t[n].tolist() for n in ('twist', 'flip', 'slice'))
+        self.corners_move, self.ud_edges_move, self.slice_edges_move = (
+            t[n].tolist() for n in ('corners', 'ud_edges', 'slice_edges'))
+        self.twist_slice, self.flip_slice, self.corners_slice, self.ud_edges_slice = (
+            memoryview(t[n]) for n in ('twist_slice', 'flip_slice', 'corners_slice', 'ud_edges_slice'))
+        self.goal_slice = int(slice_coord(list(range(12))))
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / f'{name}_v{TABLE_VERSION}.npy'
+
+    def _load(self) -> Optional[dict]:
+        paths = [self._path(name) for name in self.table_names]
+        if not all(path.exists() for path in paths):
+            return None
+        return {name: np.load(path, mmap_mode='r') for name, path in zip(self.table_names, paths)}
+
+    def _build(self) -> dict:
+        tables = _move_tables()
+        goal_slice = int(slice_coord(list(range(12))))
+        phase1 = list(range(len(MOVES)))
+        tables['twist_slice'] = _pruning_table(tables['twist'], tables['slice'], goal_slice, phase1)
+        tables['flip_slice'] = _pruning_table(tables['flip'], tables['slice'], goal_slice, phase1)
+        tables['corners_slice'] = _pruning_table(tables['corners'], tables['slice_edges'], 0, PHASE2_MOVES)
+        tables['ud_edges_slice'] = _pruning_table(tables['ud_edges'], tables['slice_edges'], 0, PHASE2_MOVES)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for name in self.table_names:
+            # write then rename, so an interrupted run never leaves a partial table
+            temporary = self._path(name).with_suffix('.tmp.npy')
+            np.save(temporary, tables[name])
+            os.replace(temporary, self._path(name))
+        return self._load()
+
+    def solve(self, model: CubeModel, max_length: int = 22, timeout: float = 5.0) -> Optional[List[Move]]:
+        """Moves that solve model in at most max_length turns, or None if none is found in time."""
+        cp, co, ep, eo = cubie_state(model)
+        self._start = (cp, ep)
+        self._deadline = time.perf_counter() + timeout
+        self._max_length = max_length
+        self._path1: List[int] = []
+        self._solution: Optional[List[int]] = None
+        twist, flip, slice_ = int(twist_coord(co)), int(flip_coord(eo)), int(slice_coord(ep))
+        try:
+            for depth in range(max_length + 1):
+                if self._phase1(twist, flip, slice_, depth, -1):
+                    return [MOVES[m] for m in self._solution]
+        except TimeoutError:
+            pass
+        return None
+
+    def _phase1(self, twist: int, flip: int, slice_: int, depth: int, last_face: int) -> bool:
+        if depth == 0:
+            # a phase-one solution that ends in a phase-two move was already
+            # tried as a shorter one
+            if twist or flip or slice_ != self.goal_slice:
+                return False
+            if self._path1 and self._path1[-1] in PHASE2_MOVES:
+                return False
+            return self._start_phase2(last_face)
+        if time.perf_counter() > self._deadline:
+            raise TimeoutError
+        twist_move, flip_move, slice_move = self.twist_move, self.flip_move, self.slice_move
+        twist_slice, flip_slice = self.twist_slice, self.flip_slice
+        for m in range(len(MOVES)):
+            face = m // 3
+            # no face twice in a row, and opposite faces in one order only
+            if face == last_face or (face ^ 1 == last_face and face & 1 == 0):
+                continue
+            t, f, s = twist_move[twist][m], flip_move[flip][m], slice_move[slice_][m]
+            if max(twist_slice[t * 495 + s], flip_slice[f * 495 + s]) >= depth:
+                continue
+            self._path1.append(m)
+            if self._phase1(t, f, s, depth - 1, face):
+                return True
+            self._path1.pop()
+        return False
+
+    def _start_phase2(self, last_face: int) -> bool:
+        cp, ep = self._start
+        for m in self._path1:
+            move_cp, move_co, move_ep, move_eo = MOVE_CUBIES[m]
+            cp = [cp[i] for i in move_cp]
+            ep = [ep[i] for i in move_ep]
+        corners = int(_rank(np.array([cp]))[0])
+        ud_edges = int(_rank(np.searchsorted(UD_EDGES, [[ep[i] for i in UD_EDGES]]))[0])
+        slice_edges = int(_rank(np.searchsorted(SLICE_EDGES, [[ep[i] for i in SLICE_EDGES]]))[0])
+        remaining = self._max_length - len(self._path1)
+        estimate = max(self.corners_slice[corners * 24 + slice_edges], self.ud_edges_slice[ud_edges * 24 + slice_edges])
+        path2: List[int] = []
+        for depth in range(estimate, remaining + 1):
+            if self._phase2(corners, ud_edges, slice_edges, depth, last_face, path2):
+                self._solution = self._path1 + path2
+                return True
+        return False
+
+    def _phase2(self, corners: int, ud_edges: int, slice_edges: int, depth: int, last_face: int,
+                path: List[int]) -> bool:
+        if depth == 0:
+            return corners == 0 and ud_edges == 0 and slice_edges == 0
+        corners_move, ud_edges_move, slice_edges_move = self.corners_move, self.ud_edges_move, self.slice_edges_move
+        corners_slice, ud_edges_slice = self.corners_slice, self.ud_edges_slice
+        for m in PHASE2_MOVES:
+            face = m // 3
+            if face == last_face or (face ^ 1 == last_face and face & 1 == 0):
+                continue
+            c, u, s = corners_move[corners][m], ud_edges_move[ud_edges][m], slice_edges_move[slice_edges][m]
+            if max(corners_slice[c * 24 + s], ud_edges_slice[u * 24 + s]) >= depth:
+                continue
+            path.append(m)
+            if self._phase2(c, u, s, depth - 1, face, path):
+                return True
+            path.pop()
+        return False
@@ -0,0 +1,28 @@
+# Fixed-step accumulator. Simulation advances in equal steps regardless of the
+# render frame rate, and alpha tells the renderer how far the current frame is
+# between the last two simulated states.
+
+class FixedTimestep:
+    def __init__(self, step: float = 1 / 60, max_steps: int = 5):
+        self.step = step
+        self.max_steps = max_steps   # caps catch-up work after a long frame
+        self.accumulator = 0.0
+
+    def advance(self, dt: float) -> int:
+        """Add a frame's dt and return how many simulation steps to run now."""
+        self.accumulator += dt
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # drop the backlog instead of spiralling: the simulation slows down
+            self.accumulator = 0.0
+            return self.max_steps
+        self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """Interpolation factor between the previous and current state, 0..1."""
+        return self.accumulator / self.step
+
+def lerp_tuple(a: tuple, b: tuple, t: float) -> tuple:
+    return tuple(x + (y - x) * t for x, y in zip(a, b))
@@ -1,11 +1,8 @@
 from ursina import *
 from ursina.prefabs.draggable import Draggable
 
-# ———————————————————————————————————————
-# App Setup
-# ———————————————————————————————————————
-app = Ursina()
-window.vsync = False
+from fixed_timestep import FixedTimestep, lerp_tuple
+from one_euro import StickFilter
 
 # ———————————————————————————————————————
 # UI: Virtual Joystick and Button
@@ -78,6 +75,12 @@ class FirstPersonController(Entity):
         mouse.locked = False
         mouse.visible = True
         self.mouse_sensitivity = Vec2(40, 40)
+        self.look_filter = StickFilter()   # smooths joystick jitter, None for raw input
+        self.move_filter = StickFilter()
+        self.joystick_move = None          # on-screen controls, passed in by the scene
+        self.joystick_look = None
+        self.button_jump = None
+        self.button_shoot = None
 
         self.gravity = 1
         self.grounded = False
@@ -89,24 +92,54 @@ class FirstPersonController(Entity):
         self.traverse_target = scene
         self.ignore_list = [self]
         self.gun = None
+        self.fixed_timestep = None   # e.g. 1/60 to move at a fixed rate, interpolated between steps
 
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+        self._stepper = FixedTimestep(self.fixed_timestep) if self.fixed_timestep else None
+
         if self.gravity:
             ray = raycast(self.world_position + (0, self.height, 0), self.down,
                           traverse_target=self.traverse_target, ignore=self.ignore_list)
             if ray.hit:
                 self.y = ray.world_point.y
 
+        self._previous_position = self._current_position = tuple(self.position)
+        self._rendered_position = self._current_position
+
     def update(self):
         if self.use_touch:
-            rot = joystick_look.value
+            rot = self._stick(self.joystick_look)
+            if self.look_filter:
+                rot = Vec2(*self.look_filter(rot, time.dt))
             self.rotation_y += rot.x * time.dt * 100
             self.camera_pivot.rotation_x = clamp(
                 self.camera_pivot.rotation_x + rot.y * time.dt * 50, -90, 90)
 
-        move = joystick_move.value
+        if not self._stepper:
+            self.simulate(time.dt)
+            return
+
+        # keep moves made outside simulate(), like the jump tween, instead of undoing them
+        if tuple(self.position) != self._rendered_position:
+            self._previous_position = self._current_position = tuple(self.position)
+
+        steps = self._stepper.advance(time.dt)
+        if steps:
+            self.position = self._current_position
+            for _ in range(steps):
+                self._previous_position = self._current_position
+                self.simulate(self._stepper.step)
+                self._current_position = tuple(self.position)
+
+        self.position = lerp_tuple(self._previous_position, self._current_position, self._stepper.alpha)
+        self._rendered_position = tuple(self.position)
+
+    def simulate(self, dt):
+        move = self._stick(self.joystick_move)
+        if self.move_filter:
+            move = Vec2(*self.move_filter(move, dt))
         direction = Vec3(self.forward * move.y + self.right * move.x).normalized()
 
         if direction:
@@ -115,7 +148,7 @@ class FirstPersonController(Entity):
             head = raycast(self.position + Vec3(0, self.height - .1, 0), direction,
                            traverse_target=self.traverse_target, ignore=self.ignore_list, distance=.5)
             if not (feet.hit or head.hit):
-                self.position += direction * self.speed * time.dt
+                self.position += direction * self.speed * dt
 
         if self.gravity:
             down_ray = raycast(self.world_position + (0, self.height, 0), self.down,
@@ -127,8 +160,8 @@ class FirstPersonController(Entity):
                 self.y = down_ray.world_point.y
             else:
                 self.grounded = False
-                self.y -= min(self.air_time, down_ray.distance - .05) * time.dt * 100
-                self.air_time += time.dt * .25 * self.gravity
+                self.y -= min(self.air_time, down_ray.distance - .05) * dt * 100
+                self.air_time += dt * .25 * self.gravity
 
     def input(self, key):
         if key == 't':
@@ -139,12 +172,21 @@ class FirstPersonController(Entity):
             self.jump()
 
         # Only shoot if not clicking a UI element
-        if key == 'left mouse down' and self.gun and not mouse.hovered_entity in (joystick_move.knob, joystick_look.knob, button_jump, button_shoot):
+        if key == 'left mouse down' and self.gun and not self._over_controls(mouse.hovered_entity):
             self.shoot()
 
         if key == 'gamepad x':
             self.shoot()
 
+    def _stick(self, joystick):
+        # a stick left as None reads as no input
+        return joystick.value if joystick else Vec2(0, 0)
+
+    def _over_controls(self, entity):
+        controls = [self.button_jump, self.button_shoot]
+        controls += [joystick.knob for joystick in (self.joystick_move, self.joystick_look) if joystick]
+        return entity is not None and entity in [control for control in controls if control]
+
     def jump(self):
         if not self.grounded:
             return
@@ -171,46 +213,52 @@ class FirstPersonController(Entity):
                                 curve=curve.linear, duration=1)
         destroy(bullet, delay=1)
 
-# ———————————————————————————————————————
-# Scene Setup
-# ———————————————————————————————————————
-
-joystick_move = VirtualJoystick(position=(-.7, -.3))
-joystick_look = VirtualJoystick(position=(.3, -.3))
-button_jump = VirtualButton('gamepad a',  position=(.6, -.1), color=color.lime)
-button_shoot = VirtualButton('gamepad x', position=(.8, -.2), color=color.red)
-
-ground = Entity(model='plane', scale=(100, 1, 100), color=color.yellow.tint(-.2),
-                texture='white_cube', texture_scale=(100, 100), collider='box')
-wall1 = Entity(model='cube', scale=(1, 5, 10), x=2, y=.01, rotation_y=45,
-               collider='box', texture='white_cube')
-wall1.texture_scale = (wall1.scale_z, wall1.scale_y)
-wall2 = Entity(model='cube', scale=(1, 5, 10), x=-2, y=.01,
-               collider='box', texture='white_cube')
-wall2.texture_scale = (wall2.scale_z, wall2.scale_y)
-
-player = FirstPersonController(y=2, origin_y=-.5)
-gun = Button(parent=scene, model='cube', color=color.blue,
-             origin_y=-.5, position=(3, 0, 3), collider='box', scale=(.2, .2, 1))
-gun.on_click = lambda: (setattr(gun, 'parent', camera), setattr(gun, 'position', Vec3(.5, 0, .5)), setattr(player, 'gun', gun))
-
-hook = Button(parent=scene, model='cube', color=color.brown, position=(4, 5, 5))
-hook.on_click = Func(player.animate_position, hook.position, duration=.5, curve=curve.linear)
-
-button_jump.on_click = player.jump
-button_shoot.on_click = player.shoot
-
-Sky()
-
-# ———————————————————————————————————————
-# Global Update
-# ———————————————————————————————————————
-
-def update():
-    if mouse.left and mouse.hovered_entity and isinstance(mouse.hovered_entity, Button):
-        return
+if __name__ == '__main__':
+    app = Ursina()
+    window.vsync = False
+
+    # ———————————————————————————————————————
+    # Scene Setup
+    # ———————————————————————————————————————
+
+    joystick_move = VirtualJoystick(position=(-.7, -.3))
+    joystick_look = VirtualJoystick(position=(.3, -.3))
+    button_jump = VirtualButton('gamepad a',  position=(.6, -.1), color=color.lime)
+    button_shoot = VirtualButton('gamepad x', position=(.8, -.2), color=color.red)
+
+    ground = Entity(model='plane', scale=(100, 1, 100), color=color.yellow.tint(-.2),
+                    texture='white_cube', texture_scale=(100, 100), collider='box')
+    wall1 = Entity(model='cube', scale=(1, 5, 10), x=2, y=.01, rotation_y=45,
+                   collider='box', texture='white_cube')
+    wall1.texture_scale = (wall1.scale_z, wall1.scale_y)
+    wall2 = Entity(model='cube', scale=(1, 5, 10), x=-2, y=.01,
+                   collider='box', texture='white_cube')
+    wall2.texture_scale = (wall2.scale_z, wall2.scale_y)
+
+    player = FirstPersonController(y=2, origin_y=-.5, fixed_timestep=1/60,
+                                   joystick_move=joystick_move, joystick_look=joystick_look,
+                                   button_jump=button_jump, button_shoot=button_shoot)
+    gun = Button(parent=scene, model='cube', color=color.blue,
+                 origin_y=-.5, position=(3, 0, 3), collider='box', scale=(.2, .2, 1))
+    gun.on_click = lambda: (setattr(gun, 'parent', camera), setattr(gun, 'position', Vec3(.5, 0, .5)), setattr(player, 'gun', gun))
+
+    hook = Button(parent=scene, model='cube', color=color.brown, position=(4, 5, 5))
+    hook.on_click = Func(player.animate_position, hook.position, duration=.5, curve=curve.linear)
+
+    button_jump.on_click = player.jump
+    button_shoot.on_click = player.shoot
+
+    Sky()
+
+    # ———————————————————————————————————————
+    # Global Update
+    # ———————————————————————————————————————
+
+    def update():
+        if mouse.left and mouse.hovered_entity and isinstance(mouse.hovered_entity, Button):
+            return
 
-# ———————————————————————————————————————
-# Run App
-# ———————————————————————————————————————
-app.run()
+    # ———————————————————————————————————————
+    # Run App
+    # ———————————————————————————————————————
+    app.run()
@@ -1,11 +1,10 @@
 from ursina import *
 from ursina.prefabs.draggable import Draggable
 
-# ———————————————————————————————————————
-# App Setup
-# ———————————————————————————————————————
-app = Ursina()
-window.vsync = False  # disable vsync for uncapped framerate
+from bullet_pool import BulletPool, TracerPool
+from collision_index import ColliderIndex
+from fixed_timestep import FixedTimestep, lerp_tuple
+from one_euro import StickFilter
 
 # ———————————————————————————————————————
 # UI: Virtual Joystick and Button
@@ -159,6 +158,11 @@ class VirtualButton(Button):
 # First Person Controller
 # ———————————————————————————————————————
 
+def _support_key(entity: Entity) -> tuple:
+    """Snapshot of a supporting collider's transform, to notice it moving."""
+    return (*entity.world_position, *entity.world_rotation, *entity.world_scale)
+
+
 class FirstPersonController(Entity):
     """
     A basic first-person character:
@@ -190,6 +194,14 @@ class FirstPersonController(Entity):
         mouse.locked         = False
         mouse.visible        = True
         self.mouse_sensitivity = Vec2(40, 40)
+        self.look_filter     = StickFilter()   # smooths joystick jitter, None for raw input
+        self.move_filter     = StickFilter()
+
+        # On-screen controls; a stick left as None reads as no input
+        self.joystick_move   = None
+        self.joystick_look   = None
+        self.button_jump     = None
+        self.button_shoot    = None
 
         # 3) Jump & gravity
         self.gravity          = 1
@@ -202,27 +214,69 @@ class FirstPersonController(Entity):
         # 4) Collision setup
         self.traverse_target = scene
         self.ignore_list     = [self]
+        self.collider_index  = None   # optional ColliderIndex broadphase
+        self.radius          = .5     # capsule used for movement sweeps
+        self.step_height     = .5     # capsule bottom, like the feet ray
         self.gun             = None
+        self.hitscan         = False  # resolve shots instantly and draw a tracer
+        self.bullet_pool     = None   # BulletPool / TracerPool, built below unless passed in
+        self.tracer_pool     = None
+
+        # Ground-contact cache, see ground_ray()
+        self._ground_hit     = None
+        self._ground_key     = None
+        self._ground_support = None
+
+        # 5) Fixed-step simulation: None keeps the old per-frame time.dt
+        #    behaviour; a step such as 1/60 runs movement and gravity at that
+        #    rate and interpolates the rendered position in between.
+        self.fixed_timestep  = None
 
         # Apply any overrides passed in
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+        self._stepper = FixedTimestep(self.fixed_timestep) if self.fixed_timestep else None
+
+        # Build both pools now so neither the first shot nor switching to
+        # hitscan creates entities mid-game
+        if self.bullet_pool is None:
+            self.bullet_pool = BulletPool()
+        if self.tracer_pool is None:
+            self.tracer_pool = TracerPool()
+
         # Snap to ground on spawn
         if self.gravity:
-            ray = raycast(
+            ray = self.raycast(
                 self.world_position + (0, self.height, 0),
-                self.down,
-                traverse_target=self.traverse_target,
-                ignore=self.ignore_list
+                self.down
             )
             if ray.hit:
                 self.y = ray.world_point.y
 
+        self._previous_position = self._current_position = tuple(self.position)
+        self._rendered_position = self._current_position
+
+    def raycast(self, origin, direction, distance: float = 9999, ignore=None):
+        """Raycast against the level, through the broadphase when one is set."""
+        if ignore is None:
+            ignore = self.ignore_list
+        if self.collider_index:
+            return self.collider_index.raycast(origin, direction, distance, ignore=ignore)
+        return raycast(
+            origin,
+            direction,
+            distance,
+            traverse_target=self.traverse_target,
+            ignore=ignore
+        )
+
     def update(self) -> None:
-        # 1) Look via right joystick
+        # 1) Look via right joystick, every frame for responsiveness
         if self.use_touch:
-            rot = joystick_look.value
+            rot = self._stick(self.joystick_look)
+            if self.look_filter:
+                rot = Vec2(*self.look_filter(rot, time.dt))
             yaw_gain   = 100
             pitch_gain = 100
             self.rotation_y += rot.x * time.dt * yaw_gain
@@ -232,37 +286,62 @@ class FirstPersonController(Entity):
                 90
             )
 
+        if not self._stepper:
+            self.simulate(time.dt)
+            return
+
+        # Anything that moved us since the last frame (jump tween, hook,
+        # teleports) becomes the new simulation state instead of being undone.
+        if tuple(self.position) != self._rendered_position:
+            self._previous_position = self._current_position = tuple(self.position)
+
+        steps = self._stepper.advance(time.dt)
+        if steps:
+            self.position = self._current_position
+            for _ in range(steps):
+                self._previous_position = self._current_position
+                self.simulate(self._stepper.step)
+                self._current_position = tuple(self.position)
+
+        self.position = lerp_tuple(self._previous_position, self._current_position, self._stepper.alpha)
+        self._rendered_position = tuple(self.position)
+
+    def simulate(self, dt: float) -> None:
+        """Advance movement and gravity by dt seconds."""
         # 2) Move via left joystick
-        move      = joystick_move.value
+        move      = self._stick(self.joystick_move)
+        if self.move_filter:
+            move  = Vec2(*self.move_filter(move, dt))
         direction = Vec3(self.forward * move.y + self.right * move.x).normalized()
 
-        if direction:
+        if direction and self.collider_index:
+            # Slide along walls with a single capsule sweep
+            half_height = (self.height - self.step_height) / 2 - self.radius
+            self.position += self.collider_index.sweep_capsule(
+                self.world_position + Vec3(0, self.height - half_height - self.radius, 0),
+                half_height,
+                self.radius,
+                direction * self.speed * dt,
+                ignore=self.ignore_list
+            )
+        elif direction:
             # Prevent walking through walls
-            feet = raycast(
+            feet = self.raycast(
                 self.position + Vec3(0, .5, 0),
                 direction,
-                traverse_target=self.traverse_target,
-                ignore=self.ignore_list,
                 distance=.5
             )
-            head = raycast(
+            head = self.raycast(
                 self.position + Vec3(0, self.height - .1, 0),
                 direction,
-                traverse_target=self.traverse_target,
-                ignore=self.ignore_list,
                 distance=.5
             )
             if not (feet.hit or head.hit):
-                self.position += direction * self.speed * time.dt
+                self.position += direction * self.speed * dt
 
         # 3) Gravity & landing
         if self.gravity:
-            down_ray = raycast(
-                self.world_position + (0, self.height, 0),
-                self.down,
-                traverse_target=self.traverse_target,
-                ignore=self.ignore_list
-            )
+            down_ray = self.ground_ray()
             if down_ray.distance <= self.height + .1 and down_ray.world_normal.y > .7:
                 if not self.grounded:
                     self.land()
@@ -273,8 +352,37 @@ class FirstPersonController(Entity):
                 self.y -= min(
                     self.air_time,
                     down_ray.distance - .05
-                ) * time.dt * 100
-                self.air_time += time.dt * .25 * self.gravity
+                ) * dt * 100
+                self.air_time += dt * .25 * self.gravity
+
+    def ground_ray(self):
+        """
+        Downward ray used for gravity. The last hit is reused while the
+        controller stays put and its support is unchanged, so a standing
+        player costs no traversal at all.
+        """
+        hit = self._ground_hit
+        if hit is not None and self._ground_key == tuple(self.world_position):
+            support = hit.entity
+            if support is None:
+                return hit
+            indexed = not self.collider_index or support in self.collider_index.boxes
+            if indexed and not support.is_empty() and support.enabled and _support_key(support) == self._ground_support:
+                return hit
+
+        hit = self.raycast(
+            self.world_position + (0, self.height, 0),
+            self.down
+        )
+        self._ground_hit = hit
+        self._ground_key = tuple(self.world_position)
+        if hit.entity is not None:
+            self._ground_support = _support_key(hit.entity)
+        return hit
+
+    def invalidate_ground_cache(self) -> None:
+        """Force the next update to cast a fresh ground ray."""
+        self._ground_hit = None
 
     def input(self, key: str) -> None:
         # Toggle touch controls
@@ -288,17 +396,22 @@ class FirstPersonController(Entity):
 
         # Shoot (if gun equipped and not clicking UI)
         if key == 'left mouse down' and self.gun \
-           and mouse.hovered_entity not in (
-               joystick_move.knob,
-               joystick_look.knob,
-               button_jump,
-               button_shoot
-           ):
+           and not self._over_controls(mouse.hovered_entity):
             self.shoot()
 
         if key == 'gamepad x':
             self.shoot()
 
+    def _stick(self, joystick) -> Vec2:
+        """A joystick's value, or no input when that stick is not attached."""
+        return joystick.value if joystick else Vec2(0, 0)
+
+    def _over_controls(self, entity) -> bool:
+        """Whether entity is one of the attached on-screen controls."""
+        controls = [self.button_jump, self.button_shoot]
+        controls += [joystick.knob for joystick in (self.joystick_move, self.joystick_look) if joystick]
+        return entity is not None and entity in [control for control in controls if control]
+
     def jump(self) -> None:
         """Animate a jump if grounded."""
         if not self.grounded:
@@ -321,105 +434,124 @@ class FirstPersonController(Entity):
         self.air_time = 0
         self.grounded = True
 
-    def shoot(self) -> None:
-        """Fire a bullet from the equipped gun."""
+    def shoot(self):
+        """
+        Fire the equipped gun. Fires a pooled bullet, or in hitscan mode
+        raycasts along the view, draws a tracer and returns the HitInfo.
+        """
         if not self.gun:
-            return
+            return None
         self.gun.blink(color.orange)
-        bullet = Entity(
-            parent=self.gun,
-            model='cube',
-            scale=.1,
-            color=color.black
-        )
-        bullet.world_parent = scene
-        bullet.animate_position(
-            bullet.position + (bullet.forward * 50),
-            curve=curve.linear,
-            duration=1
-        )
-        destroy(bullet, delay=1)
-
-
-# ———————————————————————————————————————
-# Scene Setup
-# ———————————————————————————————————————
-
-# Instantiate touch controls
-joystick_move  = VirtualJoystick(position=(-.7, -.3))
-joystick_look  = VirtualJoystick(position=( .3, -.3))
-button_jump    = VirtualButton('gamepad a', position=( .6, -.1), color=color.lime)
-button_shoot   = VirtualButton('gamepad x', position=( .8, -.2), color=color.red)
-
-# Add some environment to test collision
-ground = Entity(
-    model='plane',
-    scale=(100, 1, 100),
-    color=color.yellow.tint(-.2),
-    texture='white_cube',
-    texture_scale=(100, 100),
-    collider='box'
-)
-wall1 = Entity(
-    model='cube',
-    scale=(1, 5, 10),
-    x=2,
-    y=.01,
-    rotation_y=45,
-    collider='box',
-    texture='white_cube'
-)
-wall1.texture_scale = (wall1.scale_z, wall1.scale_y)
-
-wall2 = Entity(
-    model='cube',
-    scale=(1, 5, 10),
-    x=-2,
-    y=.01,
-    collider='box',
-    texture='white_cube'
-)
-wall2.texture_scale = (wall2.scale_z, wall2.scale_y)
-
-# Spawn player and interactive objects
-player = FirstPersonController(y=2, origin_y=-.5)
-gun = Button(
-    parent=scene,
-    model='cube',
-    color=color.blue,
-    origin_y=-.5,
-    position=(3, 0, 3),
-    collider='box',
-    scale=(.2, .2, 1)
-)
-gun.on_click = lambda: (
-    setattr(gun, 'parent', camera),
-    setattr(gun, 'position', Vec3(.5, 0, .5)),
-    setattr(player, 'gun', gun)
-)
-
-hook = Button(
-    parent=scene,
-    model='cube',
-    color=color.brown,
-    position=(4, 5, 5)
-)
-hook.on_click = Func(player.animate_position, hook.position, duration=.5, curve=curve.linear)
-
-# Bind button callbacks to player actions
-button_jump.on_click  = player.jump
-button_shoot.on_click = player.shoot
-
-Sky()  # add a skybox
-
-# ———————————————————————————————————————
-# Global Update (prevent clicks through UI)
-# ———————————————————————————————————————
-def update():
-    if mouse.left and isinstance(mouse.hovered_entity, Button):
-        return
+        if self.hitscan:
+            hit = self.raycast(camera.world_position, camera.forward, 100,
+                               ignore=self.ignore_list + [self.gun])
+            end = hit.world_point if hit.hit else camera.world_position + camera.forward * 100
+            self.tracer_pool.show(self.gun.world_position, end)
+            return hit
+        self.bullet_pool.fire(self.gun.world_position, self.gun.forward)
+        return None
+
+
+if __name__ == '__main__':
+    app = Ursina()
+    window.vsync = False  # disable vsync for uncapped framerate
+
+    # ———————————————————————————————————————
+    # Scene Setup
+    # ———————————————————————————————————————
+
+    # Instantiate touch controls
+    joystick_move  = VirtualJoystick(position=(-.7, -.3))
+    joystick_look  = VirtualJoystick(position=( .3, -.3))
+    button_jump    = VirtualButton('gamepad a', position=( .6, -.1), color=color.lime)
+    button_shoot   = VirtualButton('gamepad x', position=( .8, -.2), color=color.red)
+
+    # Add some environment to test collision
+    ground = Entity(
+        model='plane',
+        scale=(100, 1, 100),
+        color=color.yellow.tint(-.2),
+        texture='white_cube',
+        texture_scale=(100, 100),
+        collider='box'
+    )
+    wall1 = Entity(
+        model='cube',
+        scale=(1, 5, 10),
+        x=2,
+        y=.01,
+        rotation_y=45,
+        collider='box',
+        texture='white_cube'
+    )
+    wall1.texture_scale = (wall1.scale_z, wall1.scale_y)
+
+    wall2 = Entity(
+        model='cube',
+        scale=(1, 5, 10),
+        x=-2,
+        y=.01,
+        collider='box',
+        texture='white_cube'
+    )
+    wall2.texture_scale = (wall2.scale_z, wall2.scale_y)
+
+    # Broadphase over the level colliders for the controller's raycasts
+    collider_index = ColliderIndex(cell_size=4)
+    collider_index.add_entities((ground, wall1, wall2))
+
+    # Spawn player and interactive objects
+    player = FirstPersonController(
+        y=2,
+        origin_y=-.5,
+        collider_index=collider_index,
+        fixed_timestep=1/60,
+        joystick_move=joystick_move,
+        joystick_look=joystick_look,
+        button_jump=button_jump,
+        button_shoot=button_shoot
+    )
+    gun = Button(
+        parent=scene,
+        model='cube',
+        color=color.blue,
+        origin_y=-.5,
+        position=(3, 0, 3),
+        collider='box',
+        scale=(.2, .2, 1)
+    )
+    gun.on_click = lambda: (
+        setattr(gun, 'parent', camera),
+        setattr(gun, 'position', Vec3(.5, 0, .5)),
+        setattr(player, 'gun', gun)
+    )
+
+    hook = Button(
+        parent=scene,
+        model='cube',
+        color=color.brown,
+        position=(4, 5, 5)
+    )
+    hook.on_click = Func(player.animate_position, hook.position, duration=.5, curve=curve.linear)
+
+    collider_index.add(hook)
+    collider_index.add(gun, dynamic=True)   # re-indexed when picked up
+
+    # Bind button callbacks to player actions
+    button_jump.on_click  = player.jump
+    button_shoot.on_click = player.shoot
+
+    Sky()  # add a skybox
+
+    # ———————————————————————————————————————
+    # Global Update (prevent clicks through UI)
+    # ———————————————————————————————————————
+    def update():
+        collider_index.refresh()
+        if mouse.left and isinstance(mouse.hovered_entity, Button):
+            return
 
-# ———————————————————————————————————————
-# Run App
-# ———————————————————————————————————————
-app.run()
+    # ———————————————————————————————————————
+    # Run App
+    # ———————————————————————————————————————
+    app.run()
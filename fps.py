@@ -4,6 +4,15 @@ from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina.shaders import lit_with_shadows_shader
 import random
 
+from collision_index import ColliderIndex
+from ray_batch import RayBatch
+from ai_scheduler import ThinkScheduler
+from bullet_pool import TracerPool
+from projectile_system import ProjectileSystem
+from sound_cache import SoundCache
+from instancing import UnitRenderer
+from target_index import TargetIndex
+
 # ———————————————————————————————————————
 # App Setup
 # ———————————————————————————————————————
@@ -114,6 +123,17 @@ gun.muzzle_flash = Entity(
     model='quad', color=color.yellow, enabled=False
 )
 player.gun = gun  # allow FPC to know about the gun
+gun.hitscan = False   # 'h' toggles instant hits with tracers
+
+# reused tracer entities for hitscan shots
+tracers = TracerPool(size=16)
+
+# gunshot variants rendered ahead of time on a worker thread
+gun_sound = dict(volume=0.5, wave='noise', pitch_change=-12, speed=3.0)
+gun_volume_curve = [(0.0,0.0),(0.1,0.9),(0.15,0.75),(0.3,0.14),(0.6,0.0)]
+sounds = SoundCache(max_variants=8, pitch_step=.25)
+for pitch in (-13, -12.75, -12.5, -12.25, -12):
+    sounds.prefetch(gun_volume_curve, pitch=pitch, **gun_sound)
 
 # ———————————————————————————————————————
 # Shooting logic (with bullet + muzzle flash)
@@ -130,32 +150,54 @@ def shoot():
 
     # muzzle flash + sound
     gun.muzzle_flash.enabled = True
-    from ursina.prefabs.ursfx import ursfx
-    ursfx(
-        [(0.0,0.0),(0.1,0.9),(0.15,0.75),(0.3,0.14),(0.6,0.0)],
-        volume=0.5, wave='noise',
-        pitch=random.uniform(-13,-12), pitch_change=-12, speed=3.0
-    )
+    sounds.play(gun_volume_curve, pitch=random.uniform(-13,-12), **gun_sound)
     invoke(gun.muzzle_flash.disable, delay=.05)
     invoke(setattr, gun, 'on_cooldown', False, delay=.15)
 
-    # spawn bullet
-    bullet = Entity(parent=gun, 
-                    model='cube', 
-                    scale=.1, color=color.black)
-    bullet.world_parent = scene
-    bullet.animate_position(bullet.position + gun.forward * 50, curve=curve.linear, duration=1)
-    destroy(bullet, delay=1)
-
-    # damage hit target
-    if mouse.hovered_entity and hasattr(mouse.hovered_entity, 'hp'):
-        mouse.hovered_entity.hp -= 10
-        mouse.hovered_entity.blink(color.red)
+    if gun.hitscan:
+        # resolve the hit now and draw a tracer to it: aim at the enemy closest
+        # to the crosshair if it is in sight, otherwise straight ahead
+        hit = None
+        for target in targets.query_cone(camera.world_position, camera.forward, 3, 100,
+                                         predicate=lambda e: isinstance(e, Enemy))[:1]:
+            hit = collider_index.raycast(camera.world_position, target_point(target) - camera.world_position,
+                                         100, ignore=player.ignore_list)
+            if hit.entity is not target:
+                hit = None
+        if hit is None:
+            hit = collider_index.raycast(camera.world_position, camera.forward, 100,
+                                         ignore=player.ignore_list)
+        end = hit.world_point if hit.hit else camera.world_position + camera.forward * 100
+        tracers.show(gun.muzzle_flash.world_position, end)
+        if hit.hit:
+            damage(hit.entity)
+    else:
+        # the bullet deals damage when it reaches something, see projectiles;
+        # it leaves the gun towards whatever is under the crosshair
+        hit = collider_index.raycast(camera.world_position, camera.forward, 100,
+                                     ignore=player.ignore_list)
+        aim = hit.world_point if hit.hit else camera.world_position + camera.forward * 100
+        projectiles.fire(gun.world_position, (aim - gun.world_position).normalized() * 50)
+
+def damage(target, *_):
+    if hasattr(target, 'hp'):
+        target.hp -= 10
+        target.blink(color.red)
 
 # ———————————————————————————————————————
 # Input handling
 # ———————————————————————————————————————
 def update():
+    # re-index moved colliders, then answer every ray enemies queued last frame
+    collider_index.refresh()
+    sight_rays.resolve()
+    # which enemies are in range of the player this frame, for enemy think()
+    global nearby, close
+    eye = player.position + Vec3(0,1,0)
+    nearby = set(targets.query_radius(eye, 40))
+    close = set(targets.query_radius(eye, 2))
+    enemy_ai.update(time.dt)
+
     # touch‐based movement & look
     if player.use_touch:
         rot = joystick_look.value
@@ -167,12 +209,10 @@ def update():
         move = joystick_move.value
         direction = Vec3(player.forward * move.y + player.right * move.x).normalized()
         if direction:
-            feet = raycast(player.position + Vec3(0,.5,0), direction,
-                           traverse_target=player.traverse_target,
-                           ignore=player.ignore_list, distance=.5)
-            head = raycast(player.position + Vec3(0,player.height-.1,0), direction,
-                           traverse_target=player.traverse_target,
-                           ignore=player.ignore_list, distance=.5)
+            feet = collider_index.raycast(player.position + Vec3(0,.5,0), direction,
+                                          distance=.5, ignore=player.ignore_list)
+            head = collider_index.raycast(player.position + Vec3(0,player.height-.1,0), direction,
+                                          distance=.5, ignore=player.ignore_list)
             if not (feet.hit or head.hit):
                 player.position += direction * player.speed * time.dt
 
@@ -186,6 +226,10 @@ def input(key):
         player.use_touch = not player.use_touch
         mouse.locked = not player.use_touch
 
+    # toggle hitscan shooting
+    if key == 'h':
+        gun.hitscan = not gun.hitscan
+
     # jump
     if key in ('space', 'gamepad a'):
         player.jump()
@@ -211,28 +255,55 @@ button_shoot.on_click = lambda: input('gamepad x')
 # ———————————————————————————————————————
 # Enemy class & spawn
 # ———————————————————————————————————————
+# every enemy body and health bar, drawn in two instanced draw calls
+enemy_renderer = UnitRenderer(capacity=1024, body_color=color.light_gray, bar_color=color.red)
+
 class Enemy(Entity):
+    # an invisible collider; enemy_renderer draws it from its instance row
     def __init__(self, **kwargs):
-        super().__init__(parent=shootables_parent,
-                         model='cube', scale_y=2, origin_y=-.5,
-                         color=color.light_gray, collider='box', **kwargs)
-        self.health_bar = Entity(
-            parent=self, y=1.2, model='cube',
-            color=color.red, world_scale=(1.5,.1,.1)
-        )
+        super().__init__(parent=shootables_parent, scale_y=2, **kwargs)
+        self.collider = BoxCollider(self, center=Vec3(0,.5,0), size=Vec3(1,1,1))
         self.max_hp = 100
         self._hp = self.max_hp
-
-    def update(self):
-        dist = distance_xz(player.position, self.position)
-        if dist > 40:
+        self.bar_alpha = 1
+        self.flash = 0
+        self.sight_ticket = None
+        self.chasing = False
+        enemy_renderer.add(self, self.world_position, self.world_rotation_y)
+        enemy_renderer.set_bar(self, 1, self.bar_alpha)
+
+    def think(self, dt):
+        # scheduled by enemy_ai: every frame up close, less often further away
+        if self not in nearby:
+            self.chasing = False
             return
-        self.health_bar.alpha = max(0, self.health_bar.alpha - time.dt)
         self.look_at_2d(player.position, 'y')
-        hit = raycast(self.world_position + Vec3(0,1,0),
-                      self.forward, 30, ignore=(self,))
-        if hit.entity == player and dist > 2:
+        enemy_renderer.set_transform(self, self.world_position, self.world_rotation_y)
+        self.read_sight()
+        self.chasing = self.chasing and self not in close
+        self.sight_ticket = sight_rays.submit(self.world_position + Vec3(0,1,0),
+                                              self.forward, 30, ignore=(self,))
+
+    def read_sight(self):
+        if sight_rays.ready(self.sight_ticket):
+            self.chasing = sight_rays.hit_entity(self.sight_ticket) == player
+            self.sight_ticket = None
+
+    def update(self):
+        # per frame: pick up the sight check once resolved, fade the bar, move
+        self.read_sight()
+        if self.bar_alpha or self.flash:
+            self.bar_alpha = max(0, self.bar_alpha - time.dt)
+            self.flash = max(0, self.flash - time.dt * 10)
+            enemy_renderer.set_bar(self, self.hp / self.max_hp, self.bar_alpha)
+            enemy_renderer.set_flash(self, self.flash)
+        if self.chasing:
             self.position += self.forward * time.dt * 5
+            enemy_renderer.set_transform(self, self.world_position, self.world_rotation_y)
+            targets.update(self, target_point(self))
+
+    def blink(self, value=color.red, **kwargs):
+        self.flash = 1
 
     @property
     def hp(self):
@@ -242,13 +313,41 @@ class Enemy(Entity):
     def hp(self, value):
         self._hp = value
         if value <= 0:
+            enemy_ai.remove(self)
+            collider_index.remove(self)
+            enemy_renderer.remove(self)
+            targets.remove(self)
             destroy(self)
             return
-        self.health_bar.world_scale_x = (value/self.max_hp)*1.5
-        self.health_bar.alpha = 1
+        self.bar_alpha = 1
+        enemy_renderer.set_bar(self, value / self.max_hp, self.bar_alpha)
 
 enemies = [Enemy(x=x*4) for x in range(4)]
 
+# broadphase for all gameplay raycasts: static level + moving enemies and player
+collider_index = ColliderIndex(cell_size=4)
+collider_index.add(ground)
+collider_index.add_entities(e for e in shootables_parent.children if not isinstance(e, Enemy))
+collider_index.add_entities(enemies, dynamic=True)
+collider_index.add(player, dynamic=True)
+# enemy line-of-sight rays, resolved together once per frame
+sight_rays = RayBatch(collider_index)
+# bullets: moved, collided and drawn as one batch
+projectiles = ProjectileSystem(collider_index, lifetime=1, ignore_list=[player], on_hit=damage)
+# enemy think ticks, staggered by distance to the player under a 2 ms budget
+enemy_ai = ThinkScheduler(focus=lambda: player.position, budget=.002)
+for enemy in enemies:
+    enemy_ai.add(enemy)
+
+# grid of shootables by body centre, for range checks and aim assist
+def target_point(entity):
+    return entity.world_position + Vec3(0, entity.world_scale_y / 2, 0)
+
+targets = TargetIndex(cell_size=8)
+for entity in shootables_parent.children:
+    targets.add(entity, target_point(entity))
+nearby, close = set(), set()
+
 # ———————————————————————————————————————
 # Final setup: sky & lighting
 # ———————————————————————————————————————
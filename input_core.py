@@ -0,0 +1,258 @@
+# Engine-independent input simulation. The same joystick clamping, dead zones,
+# button state and entity driving that InputManager uses, on plain Python data,
+# so an authoritative server can step thousands of clients without ursina.
+# The controls in virtual_controls.py and touch_control.py are thin views over
+# these states.
+
+import math
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+from one_euro import StickFilter
+
+if TYPE_CHECKING:
+    from callback_dispatcher import CallbackDispatcher
+    from coroutine_runner import CoroutineRunner
+
+DEFAULT_BUTTONS = ('gamepad a', 'gamepad b', 'gamepad x', 'gamepad y')
+
+class JoystickState:
+    """Knob offset and output value of one virtual joystick."""
+    __slots__ = ('radius', 'sensitivity', 'dead_zone', 'knob_x', 'knob_y', 'x', 'y')
+
+    def __init__(self, radius: float = 80, sensitivity: float = 1.0, dead_zone: float = 0.05):
+        self.radius = radius
+        self.sensitivity = sensitivity
+        self.dead_zone = dead_zone
+        self.knob_x = 0.0
+        self.knob_y = 0.0
+        self.x = 0.0
+        self.y = 0.0
+
+    def drag_to(self, x: float, y: float) -> Tuple[float, float]:
+        """Move the knob to (x, y) in joystick space and return the clamped offset."""
+        max_offset = self.radius / 100
+        length = math.hypot(x, y)
+        if length > max_offset:
+            x = x / length * max_offset
+            y = y / length * max_offset
+            length = max_offset
+        self.knob_x = x
+        self.knob_y = y
+        scale = (100 / self.radius) * self.sensitivity
+        if length * scale < self.dead_zone:
+            self.x = 0.0
+            self.y = 0.0
+        else:
+            self.x = x * scale
+            self.y = y * scale
+        return x, y
+
+    def release(self) -> None:
+        self.knob_x = self.knob_y = 0.0
+        self.x = self.y = 0.0
+
+    @property
+    def value(self) -> Tuple[float, float]:
+        return self.x, self.y
+
+class ButtonState:
+    """
+    Pressed flag and callbacks of one virtual button. With a dispatcher the
+    callbacks go through its frame budget instead of running inline.
+    """
+    __slots__ = ('key_name', 'is_pressed', 'on_press_callbacks', 'on_release_callbacks', 'dispatcher')
+
+    def __init__(self, key_name: str = 'gamepad a', dispatcher: Optional['CallbackDispatcher'] = None):
+        self.key_name = key_name
+        self.is_pressed = False
+        self.on_press_callbacks: List[Callable[[str], None]] = []
+        self.on_release_callbacks: List[Callable[[str], None]] = []
+        self.dispatcher = dispatcher
+
+    def press(self) -> None:
+        self.is_pressed = True
+        _call_all(self.on_press_callbacks, self.key_name, self.dispatcher)
+
+    def release(self) -> None:
+        self.is_pressed = False
+        _call_all(self.on_release_callbacks, self.key_name, self.dispatcher)
+
+    def add_on_press_callback(self, callback: Callable[[str], None]) -> None:
+        self.on_press_callbacks.append(callback)
+
+    def add_on_release_callback(self, callback: Callable[[str], None]) -> None:
+        self.on_release_callbacks.append(callback)
+
+def _call_all(callbacks: List[Callable[[str], None]], key_name: str,
+              dispatcher: Optional['CallbackDispatcher']) -> None:
+    if dispatcher is None:
+        for callback in callbacks:
+            callback(key_name)
+    else:
+        for callback in callbacks:
+            dispatcher.dispatch(callback, key_name)
+
+class BodyState:
+    """
+    Position and rotation of a driven entity, in ursina's conventions:
+    y up, z forward, positive rotation_x pitches down, positive
+    rotation_y turns right. Roll is never written by the input core.
+    """
+    __slots__ = ('x', 'y', 'z', 'rotation_x', 'rotation_y')
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0,
+                 rotation_x: float = 0.0, rotation_y: float = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.rotation_x = rotation_x
+        self.rotation_y = rotation_y
+
+    @property
+    def position(self) -> Tuple[float, float, float]:
+        return self.x, self.y, self.z
+
+    @property
+    def forward(self) -> Tuple[float, float, float]:
+        yaw = math.radians(self.rotation_y)
+        pitch = math.radians(self.rotation_x)
+        return (math.sin(yaw) * math.cos(pitch), -math.sin(pitch), math.cos(yaw) * math.cos(pitch))
+
+    @property
+    def right(self) -> Tuple[float, float, float]:
+        yaw = math.radians(self.rotation_y)
+        return (math.cos(yaw), 0.0, -math.sin(yaw))
+
+class InputCore:
+    """
+    Pure-data equivalent of InputManager: two joysticks, a set of buttons,
+    per-key callbacks and the movement applied to driven entities.
+    """
+    def __init__(self,
+                 sensitivity: float = 1.0,
+                 dead_zone: float = 0.05,
+                 button_names: Iterable[str] = DEFAULT_BUTTONS,
+                 smoothing: bool = True,
+                 dispatcher: Optional['CallbackDispatcher'] = None,
+                 coroutine_time_slice: float = .002
+            ):
+        self.sensitivity = sensitivity
+        # registered callbacks run through dispatcher's frame budget when set
+        self.dispatcher = dispatcher
+        # coroutine callbacks run on a CoroutineRunner, created with the first
+        # one registered; pump it with update_coroutines() every frame
+        self.coroutines: Optional['CoroutineRunner'] = None
+        self.coroutine_time_slice = coroutine_time_slice
+        self.joystick_left = JoystickState(sensitivity=sensitivity, dead_zone=dead_zone)
+        self.joystick_right = JoystickState(sensitivity=sensitivity, dead_zone=dead_zone)
+        # Adaptive low-pass filters between the sticks and movement, so thumb
+        # jitter does not shake the camera; None passes values straight through.
+        self.left_filter = StickFilter() if smoothing else None
+        self.right_filter = StickFilter() if smoothing else None
+        self.buttons: Dict[str, ButtonState] = {name: ButtonState(name) for name in button_names}
+
+        self.button_press_callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self.button_release_callbacks: Dict[str, List[Callable[[str], None]]] = {}
+
+        for button in self.buttons.values():
+            button.add_on_press_callback(self._on_button_press)
+            button.add_on_release_callback(self._on_button_release)
+
+    def _on_button_press(self, key_name: str) -> None:
+        if key_name in self.button_press_callbacks:
+            _call_all(self.button_press_callbacks[key_name], key_name, self.dispatcher)
+
+    def _on_button_release(self, key_name: str) -> None:
+        if key_name in self.button_release_callbacks:
+            _call_all(self.button_release_callbacks[key_name], key_name, self.dispatcher)
+
+    def register_button_press_callback(self, key_name: str, callback: Callable[[str], None]) -> None:
+        """callback(key_name) on press; an async def callback is started as a coroutine."""
+        if key_name not in self.button_press_callbacks:
+            self.button_press_callbacks[key_name] = []
+        self.button_press_callbacks[key_name].append(self._plain_callback(callback))
+
+    def register_button_release_callback(self, key_name: str, callback: Callable[[str], None]) -> None:
+        if key_name not in self.button_release_callbacks:
+            self.button_release_callbacks[key_name] = []
+        self.button_release_callbacks[key_name].append(self._plain_callback(callback))
+
+    def _plain_callback(self, callback: Callable) -> Callable[[str], None]:
+        from inspect import iscoroutinefunction
+        if not iscoroutinefunction(callback):
+            return callback
+        if self.coroutines is None:
+            from coroutine_runner import CoroutineRunner
+            self.coroutines = CoroutineRunner(self.coroutine_time_slice)
+        return self.coroutines.starter(callback)
+
+    def update_coroutines(self) -> None:
+        """Step coroutine callbacks for up to coroutine_time_slice seconds."""
+        if self.coroutines:
+            self.coroutines.update()
+
+    def press(self, key_name: str) -> None:
+        self.buttons[key_name].press()
+
+    def release(self, key_name: str) -> None:
+        self.buttons[key_name].release()
+
+    def movement(self, dt: float) -> Tuple[float, float, float, float]:
+        """
+        Return (move_x, move_z, rot_y, rot_x) for one step of dt seconds. Each
+        call is one sample for the stick filters.
+        """
+        gain = dt * self.sensitivity
+        left_x, left_y = self.joystick_left.value
+        right_x, right_y = self.joystick_right.value
+        if self.left_filter:
+            left_x, left_y = self.left_filter((left_x, left_y), dt)
+        if self.right_filter:
+            right_x, right_y = self.right_filter((right_x, right_y), dt)
+        return (left_x * gain * 4,
+                left_y * gain * 4,
+                right_x * gain * 100,
+                -right_y * gain * 50)
+
+    def drive(self, body: BodyState, dt: float) -> None:
+        """Apply one step of joystick movement to body, like InputManager.update."""
+        move_x, move_z, rot_y, rot_x = self.movement(dt)
+        if move_x or move_z:
+            yaw = math.radians(body.rotation_y)
+            pitch = math.radians(body.rotation_x)
+            sin_yaw, cos_yaw = math.sin(yaw), math.cos(yaw)
+            cos_pitch = math.cos(pitch)
+            body.x += cos_yaw * move_x + sin_yaw * cos_pitch * move_z
+            body.y -= math.sin(pitch) * move_z
+            body.z += -sin_yaw * move_x + cos_yaw * cos_pitch * move_z
+        body.rotation_y += rot_y
+        body.rotation_x += rot_x
+
+    def get_axis(self, axis_name: str) -> float:
+        if axis_name == 'left_x':
+            return self.joystick_left.x
+        elif axis_name == 'left_y':
+            return self.joystick_left.y
+        elif axis_name == 'right_x':
+            return self.joystick_right.x
+        elif axis_name == 'right_y':
+            return self.joystick_right.y
+        return 0.0
+
+    def get_button(self, button_name: str) -> bool:
+        button = self.buttons.get(button_name)
+        return button.is_pressed if button else False
+
+def step_clients(cores: List[InputCore], bodies: List[BodyState], dt: float,
+                 drag: Optional[Callable[[int, InputCore], None]] = None) -> None:
+    """
+    Advance every client by dt. cores[i] drives bodies[i]; drag, if given, is
+    called first with (i, core) to feed that tick's knob positions.
+    """
+    if drag is None:
+        for core, body in zip(cores, bodies):
+            core.drive(body, dt)
+        return
+    for i, (core, body) in enumerate(zip(cores, bodies)):
+        drag(i, core)
+        core.drive(body, dt)
@@ -1,182 +1,216 @@
-from typing import Callable, Optional, List, Dict
-from ursina import *
-from ursina.prefabs.draggable import Draggable
+# Window-free input manager. Nothing here imports ursina at module level, so
+# tools, tests and servers can use InputManager without opening a window;
+# the engine is only imported once on-screen controls are instantiated.
+
+import time
+from typing import Callable, Optional, List, TYPE_CHECKING
+
+from input_core import BodyState, InputCore
+from fixed_timestep import FixedTimestep, lerp_tuple
+
+if TYPE_CHECKING:
+    from ursina import Entity
+    from callback_dispatcher import CallbackDispatcher
+    from touch_telemetry import TouchTelemetry
+
+_ursina = None
+
+def _engine():
+    """Import ursina on first use and cache the module."""
+    global _ursina
+    if _ursina is None:
+        import ursina
+        _ursina = ursina
+    return _ursina
+
+def __getattr__(name: str):
+    # VirtualJoystick/VirtualButton used to live here; keep them importable
+    # from this module without paying for ursina on plain imports.
+    if name in ('VirtualJoystick', 'VirtualButton'):
+        import virtual_controls
+        return getattr(virtual_controls, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 def mm_to_ui(mm: float, mm_per_px_x: float = 68.0 / 1080) -> float:
     px = mm / mm_per_px_x
     return px / 1080
 
-class VirtualJoystick(Entity):
-    def __init__(self, 
-                 radius: int = 80, 
-                 position: tuple = (-.7, -.4), 
-                 sensitivity: float = 1.0, 
-                 dead_zone: float = 0.05, 
-                 **kwargs
-            ):
-        super().__init__(parent=camera.ui, 
-                         position=position, 
-                         scale=(.2, .2), 
-                         **kwargs
-                    )
-        self.radius = radius
-        self.sensitivity = sensitivity
-        self.dead_zone = dead_zone
-        self.bg = Entity(parent=self, model='circle', color=color.dark_gray, scale=2)
-        self.knob = Draggable(parent=self, model='circle', color=color.white, scale=1)
-        self.knob.always_on_top = True
-        self.knob.start_position = self.knob.position
-        self.value = Vec2(0, 0)
-
-    def update(self) -> None:
-        if self.knob.dragging:
-            offset = Vec2(self.knob.position.x, self.knob.position.y)
-            max_offset = self.radius / 100
-            if offset.length() > max_offset:
-                offset = offset.normalized() * max_offset
-            self.knob.position = offset
-            val = offset * (100 / self.radius) * self.sensitivity
-            if val.length() < self.dead_zone:
-                val = Vec2(0, 0)
-            self.value = val
-        else:
-            self.knob.position = self.knob.start_position
-            self.value = Vec2(0, 0)
-
-class VirtualButton(Button):
-    def __init__(self, 
-                 key_name: str = 'gamepad a', 
-                 position: tuple = (.5, -.4), 
-                 color=color.azure, 
-                 **kwargs
-            ):
-        super().__init__(parent=camera.ui, position=position, color=color, scale=.1, **kwargs)
-        self.key_name = key_name
-        self.is_pressed = False
-        self.on_press_callbacks: List[Callable[[str], None]] = []
-        self.on_release_callbacks: List[Callable[[str], None]] = []
-
-    def on_press(self) -> None:
-        self.is_pressed = True
-        held_keys[self.key_name] = 1
-        for callback in self.on_press_callbacks:
-            callback(self.key_name)
-
-    def on_release(self) -> None:
-        self.is_pressed = False
-        held_keys[self.key_name] = 0
-        for callback in self.on_release_callbacks:
-            callback(self.key_name)
-
-    def input(self, key: str) -> None:
-        if not self.hovered:
-            return
-        if key == 'left mouse down':
-            self.is_pressed = True
-            held_keys[self.key_name] = 1
-            for callback in self.on_press_callbacks:
-                callback(self.key_name)
-        elif key == 'left mouse up':
-            self.is_pressed = False
-            held_keys[self.key_name] = 0
-            for callback in self.on_release_callbacks:
-                callback(self.key_name)
-
-    def add_on_press_callback(self, callback: Callable[[str], None]) -> None:
-        self.on_press_callbacks.append(callback)
-
-    def add_on_release_callback(self, callback: Callable[[str], None]) -> None:
-        self.on_release_callbacks.append(callback)
-
 class InputManager:
     def __init__(self, 
-                 entities: Optional[List[Entity]] = None, 
+                 entities: Optional[List['Entity']] = None, 
                  enable_onscreen_controls: bool = True, 
                  sensitivity: float = 1.0, 
-                 dead_zone: float = 0.05
+                 dead_zone: float = 0.05,
+                 lazy_onscreen_controls: bool = False,
+                 fixed_timestep: Optional[float] = None,
+                 smoothing: bool = True,
+                 telemetry: Optional['TouchTelemetry'] = None,
+                 callback_budget: Optional[float] = None,
+                 coroutine_time_slice: float = .002
             ):
         self.entities = entities if entities else []
         self.enable_onscreen_controls = enable_onscreen_controls
-        self.sensitivity = sensitivity
+        self.lazy_onscreen_controls = lazy_onscreen_controls
         self.dead_zone = dead_zone
 
-        if self.enable_onscreen_controls:
-            self.joystick_left = VirtualJoystick(position=(-.7, -.3), 
-                                                 sensitivity=self.sensitivity, 
-                                                 dead_zone=self.dead_zone)
-            self.joystick_right = VirtualJoystick(position=(.3, -.3), 
-                                                  sensitivity=self.sensitivity, 
-                                                  dead_zone=self.dead_zone)
-            self.buttons = [
-                VirtualButton('gamepad a', position=(.7, -.1), color=color.lime),
-                VirtualButton('gamepad b', position=(.8, -.2), color=color.red),
-                VirtualButton('gamepad x', position=(.6, -.2), color=color.cyan),
-                VirtualButton('gamepad y', position=(.7, -.3), color=color.yellow)
-            ]
-        else:
-            self.joystick_left = None
-            self.joystick_right = None
-            self.buttons = []
-
-        self.button_press_callbacks: Dict[str, List[Callable[[str], None]]] = {}
-        self.button_release_callbacks: Dict[str, List[Callable[[str], None]]] = {}
-
-        for button in self.buttons:
-            button.add_on_press_callback(self._on_button_press)
-            button.add_on_release_callback(self._on_button_release)
+        # With a callback_budget (seconds), button callbacks share that much
+        # frame time and the rest wait for later frames; callbacks wrapped with
+        # callback_dispatcher.heavy() run on a pool. None runs them inline.
+        self.dispatcher: Optional['CallbackDispatcher'] = None
+        if callback_budget is not None:
+            from callback_dispatcher import CallbackDispatcher
+            self.dispatcher = CallbackDispatcher(callback_budget)
+
+        # All control logic lives in the engine-independent core; the
+        # on-screen joysticks and buttons are views over its states.
+        self.core = InputCore(sensitivity=sensitivity, dead_zone=dead_zone, smoothing=smoothing,
+                              dispatcher=self.dispatcher, coroutine_time_slice=coroutine_time_slice)
+        self.button_press_callbacks = self.core.button_press_callbacks
+        self.button_release_callbacks = self.core.button_release_callbacks
+
+        self.joystick_left = None
+        self.joystick_right = None
+        self.buttons = []
+
+        # Optional touch heatmaps: each control records where it is grabbed,
+        # and update() records every touch on the screen and the ones that
+        # landed on no control.
+        self.telemetry = telemetry
+        self._touching = False
+
+        # With a fixed_timestep, entities are driven at that rate on BodyState
+        # copies and their rendered pose is interpolated between steps.
+        self._stepper = FixedTimestep(fixed_timestep) if fixed_timestep else None
+        self._simulated = {}
+
+        # In lazy mode nothing is added to the scene graph until the first
+        # touch reaches update(); until then get_axis/get_button stay neutral.
+        # That touch is then replayed into whichever new control it landed on.
+        if self.enable_onscreen_controls and not self.lazy_onscreen_controls:
+            self.build_onscreen_controls()
+
+    @property
+    def sensitivity(self) -> float:
+        return self.core.sensitivity
+
+    @sensitivity.setter
+    def sensitivity(self, value: float) -> None:
+        self.core.sensitivity = value
+
+    @property
+    def onscreen_controls_built(self) -> bool:
+        return self.joystick_left is not None
+
+    def build_onscreen_controls(self) -> None:
+        if self.onscreen_controls_built:
+            return
+        from virtual_controls import VirtualJoystick, VirtualButton
+        color = _engine().color
+        telemetry = self.telemetry
+        self.joystick_left = VirtualJoystick(position=(-.7, -.3), state=self.core.joystick_left,
+                                             telemetry=telemetry, name='left_stick')
+        self.joystick_right = VirtualJoystick(position=(.3, -.3), state=self.core.joystick_right,
+                                              telemetry=telemetry, name='right_stick')
+        buttons = self.core.buttons
+        self.buttons = [
+            VirtualButton(position=(.7, -.1), color=color.lime, state=buttons['gamepad a'], telemetry=telemetry),
+            VirtualButton(position=(.8, -.2), color=color.red, state=buttons['gamepad b'], telemetry=telemetry),
+            VirtualButton(position=(.6, -.2), color=color.cyan, state=buttons['gamepad x'], telemetry=telemetry),
+            VirtualButton(position=(.7, -.3), color=color.yellow, state=buttons['gamepad y'], telemetry=telemetry)
+        ]
 
     def _on_button_press(self, key_name: str) -> None:
-        if key_name in self.button_press_callbacks:
-            for callback in self.button_press_callbacks[key_name]:
-                callback(key_name)
+        self.core._on_button_press(key_name)
 
     def _on_button_release(self, key_name: str) -> None:
-        if key_name in self.button_release_callbacks:
-            for callback in self.button_release_callbacks[key_name]:
-                callback(key_name)
+        self.core._on_button_release(key_name)
 
     def register_button_press_callback(self, key_name: str, callback: Callable[[str], None]) -> None:
-        if key_name not in self.button_press_callbacks:
-            self.button_press_callbacks[key_name] = []
-        self.button_press_callbacks[key_name].append(callback)
+        self.core.register_button_press_callback(key_name, callback)
 
     def register_button_release_callback(self, key_name: str, callback: Callable[[str], None]) -> None:
-        if key_name not in self.button_release_callbacks:
-            self.button_release_callbacks[key_name] = []
-        self.button_release_callbacks[key_name].append(callback)
+        self.core.register_button_release_callback(key_name, callback)
 
     def update(self) -> None:
-        if self.enable_onscreen_controls:
-            self.joystick_left.update()
-            self.joystick_right.update()
+        if self.dispatcher:
+            self.dispatcher.update()
+        # async def button callbacks advance here, within coroutine_time_slice
+        self.core.update_coroutines()
 
-        dt = time.dt
-        for entity in self.entities:
-            if self.enable_onscreen_controls and self.joystick_left and self.joystick_right:
-                move_x = self.joystick_left.value.x * dt * 4 * self.sensitivity
-                move_z = self.joystick_left.value.y * dt * 4 * self.sensitivity
-                entity.position += entity.right * move_x + entity.forward * move_z
+        if self.enable_onscreen_controls and not self.onscreen_controls_built:
+            if not _engine().held_keys['left mouse']:
+                return
+            self.build_onscreen_controls()
+            self._replay_press()
+
+        if not self.enable_onscreen_controls:
+            return
 
-                rot_y = self.joystick_right.value.x * dt * 100 * self.sensitivity
-                rot_x = -self.joystick_right.value.y * dt * 50 * self.sensitivity
-                entity.rotation_y += rot_y
-                entity.rotation_x += rot_x
+        self.joystick_left.update()
+        self.joystick_right.update()
+        if self.telemetry:
+            self._record_touches()
+
+        dt = time.dt  # set on the stdlib time module by ursina every frame
+        if self._stepper:
+            steps = self._stepper.advance(dt)
+            for entity in self.entities:
+                self._drive_fixed(entity, steps)
+            return
+
+        move_x, move_z, rot_y, rot_x = self.core.movement(dt)
+        for entity in self.entities:
+            entity.position += entity.right * move_x + entity.forward * move_z
+            entity.rotation_y += rot_y
+            entity.rotation_x += rot_x
+
+    def _replay_press(self) -> None:
+        """Hand the touch that triggered a lazy build to the control now under it."""
+        mouse = _engine().mouse
+        mouse.update()   # this frame's hovered_entity was picked before the controls existed
+        hovered = mouse.hovered_entity
+        if hovered is not None and hovered in (self.joystick_left.knob, self.joystick_right.knob, *self.buttons):
+            hovered.input('left mouse down')
+
+    def _record_touches(self) -> None:
+        engine = _engine()
+        touching = bool(engine.held_keys['left mouse'])
+        if touching and not self._touching:
+            # screen space as -1..1 on both axes
+            x, y = engine.mouse.position.x / (engine.window.aspect_ratio / 2), engine.mouse.position.y * 2
+            self.telemetry.record('screen', x, y)
+            controls = (self.joystick_left.knob, self.joystick_right.knob, *self.buttons)
+            if engine.mouse.hovered_entity not in controls:
+                self.telemetry.count('screen', 'misses')
+        self._touching = touching
+        self.telemetry.update()
+
+    def _drive_fixed(self, entity: 'Entity', steps: int) -> None:
+        pose = (*entity.position, entity.rotation_x, entity.rotation_y)
+        simulated = self._simulated.get(entity)
+        # first sight, or moved by something else since we last rendered it
+        if simulated is None or pose != simulated[2]:
+            simulated = [pose, BodyState(*pose), pose]
+            self._simulated[entity] = simulated
+
+        previous, body = simulated[0], simulated[1]
+        for _ in range(steps):
+            previous = (body.x, body.y, body.z, body.rotation_x, body.rotation_y)
+            self.core.drive(body, self._stepper.step)
+        simulated[0] = previous
+
+        current = (body.x, body.y, body.z, body.rotation_x, body.rotation_y)
+        x, y, z, rotation_x, rotation_y = lerp_tuple(previous, current, self._stepper.alpha)
+        entity.position = (x, y, z)
+        entity.rotation = (rotation_x, rotation_y, entity.rotation_z)
+        simulated[2] = (*entity.position, entity.rotation_x, entity.rotation_y)
 
     def get_axis(self, axis_name: str) -> float:
         if not self.enable_onscreen_controls:
             return 0.0
-        if axis_name == 'left_x':
-            return self.joystick_left.value.x if self.joystick_left else 0.0
-        elif axis_name == 'left_y':
-            return self.joystick_left.value.y if self.joystick_left else 0.0
-        elif axis_name == 'right_x':
-            return self.joystick_right.value.x if self.joystick_right else 0.0
-        elif axis_name == 'right_y':
-            return self.joystick_right.value.y if self.joystick_right else 0.0
-        return 0.0
+        return self.core.get_axis(axis_name)
 
     def get_button(self, button_name: str) -> bool:
-        for button in self.buttons:
-            if button.key_name == button_name:
-                return button.is_pressed
-        return False
+        if not self.buttons:
+            return False
+        return self.core.get_button(button_name)
@@ -0,0 +1,235 @@
+# Hardware-instanced rendering: many copies of one model drawn in a single
+# draw call. Per-instance data lives in a float buffer texture that the vertex
+# shader reads with gl_InstanceID, so moving every instance is one upload
+# instead of one transform change per Entity.
+
+import math
+from typing import Dict, List
+
+import numpy as np
+from panda3d.core import GeomEnums, OmniBoundingVolume, TransparencyAttrib
+from panda3d.core import Texture as PandaTexture
+from ursina import *
+
+instanced_shader = Shader(name='instanced_shader', language=Shader.GLSL, vertex='''#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instance_data;
+in vec4 p3d_Vertex;
+in vec4 p3d_Color;
+out vec4 vertex_color;
+
+void main() {
+    vec4 data = texelFetch(instance_data, gl_InstanceID);   // xyz offset, w scale
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(p3d_Vertex.xyz * data.w + data.xyz, 1.0);
+    vertex_color = p3d_Color;
+}
+''',
+fragment='''#version 140
+uniform vec4 p3d_ColorScale;
+in vec4 vertex_color;
+out vec4 fragColor;
+
+void main() {
+    fragColor = p3d_ColorScale * vertex_color;
+}
+''')
+
+class InstanceBuffer:
+    """
+    capacity rows of per-instance data, each texels RGBA32F texels wide, in a
+    buffer texture. Several InstancedModels can read the same buffer.
+    """
+    def __init__(self, capacity: int = 1024, texels: int = 1):
+        self.capacity = capacity
+        self.texels = texels
+        self.data = np.zeros((capacity, texels, 4), dtype=np.float32)
+        self.texture = PandaTexture('instance_data')
+        self.texture.setup_buffer_texture(capacity * texels, PandaTexture.T_float, PandaTexture.F_rgba32, GeomEnums.UH_dynamic)
+        self.upload()
+
+    def upload(self) -> None:
+        self.texture.set_ram_image(self.data)
+
+class InstancedModel(Entity):
+    """
+    Draws up to capacity copies of model, each offset and uniformly scaled
+    by a row of set_instances(). Instances are in this entity's space. Pass
+    a shared buffer and a custom shader to lay out the data differently.
+    """
+    def __init__(self, model='cube', capacity: int = 1024, buffer: InstanceBuffer = None,
+                 shader=instanced_shader, **kwargs):
+        super().__init__(model=model, shader=shader, **kwargs)
+        self.buffer = buffer or InstanceBuffer(capacity)
+        self.capacity = self.buffer.capacity
+        self.count = 0
+        self.data = self.buffer.data[:, 0]
+        self.set_shader_input('instance_data', self.buffer.texture)
+        # instances can be anywhere, so never cull on the model's own bounds
+        for node in (self.node(), self.model.node()):
+            node.set_bounds(OmniBoundingVolume())
+            node.set_final(True)
+        self.visible = False
+
+    def set_instances(self, positions: np.ndarray, scales=1.0) -> None:
+        """Show one instance per row of positions (n x 3); scales is a float or n values."""
+        n = min(len(positions), self.capacity)
+        self.data[:n, :3] = positions[:n]
+        self.data[:n, 3] = scales if np.isscalar(scales) else scales[:n]
+        self.buffer.upload()
+        self.show_instances(n)
+
+    def show_instances(self, count: int) -> None:
+        """Draw the first count rows of the buffer."""
+        self.count = count
+        # an instance count of 0 would mean "not instanced", i.e. one copy
+        self.visible = count > 0
+        if count:
+            self.set_instance_count(count)
+
+unit_body_shader = Shader(name='unit_body_shader', language=Shader.GLSL, vertex='''#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instance_data;
+uniform vec3 model_offset;
+uniform vec3 model_scale;
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+out float shade;
+out float flash;
+
+vec3 turn(vec3 v, float yaw) {   // ursina rotation_y: positive turns right
+    return vec3(v.x * cos(yaw) + v.z * sin(yaw), v.y, -v.x * sin(yaw) + v.z * cos(yaw));
+}
+
+void main() {
+    vec4 place = texelFetch(instance_data, gl_InstanceID * 2);        // xyz, yaw
+    vec4 status = texelFetch(instance_data, gl_InstanceID * 2 + 1);   // bar fraction, bar alpha, flash
+    vec3 local = (p3d_Vertex.xyz + model_offset) * model_scale;
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(turn(local, place.w) + place.xyz, 1.0);
+    shade = .65 + .35 * max(dot(turn(p3d_Normal, place.w), normalize(vec3(.4, 1., -.6))), 0.);
+    flash = status.z;
+}
+''',
+fragment='''#version 140
+uniform vec4 p3d_ColorScale;
+uniform vec4 flash_color;
+in float shade;
+in float flash;
+out vec4 fragColor;
+
+void main() {
+    vec4 color = mix(p3d_ColorScale, flash_color, clamp(flash, 0., 1.));
+    fragColor = vec4(color.rgb * shade, color.a);
+}
+''')
+
+unit_bar_shader = Shader(name='unit_bar_shader', language=Shader.GLSL, vertex='''#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform samplerBuffer instance_data;
+uniform vec3 bar_offset;
+uniform vec3 bar_size;
+in vec4 p3d_Vertex;
+out float alpha;
+
+vec3 turn(vec3 v, float yaw) {
+    return vec3(v.x * cos(yaw) + v.z * sin(yaw), v.y, -v.x * sin(yaw) + v.z * cos(yaw));
+}
+
+void main() {
+    vec4 place = texelFetch(instance_data, gl_InstanceID * 2);
+    vec4 status = texelFetch(instance_data, gl_InstanceID * 2 + 1);
+    alpha = status.y;
+    // hidden bars collapse to a point instead of drawing transparent pixels
+    vec3 size = bar_size * vec3(status.x, 1., 1.) * step(.001, alpha);
+    vec3 local = p3d_Vertex.xyz * size + bar_offset;
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(turn(local, place.w) + place.xyz, 1.0);
+}
+''',
+fragment='''#version 140
+uniform vec4 p3d_ColorScale;
+in float alpha;
+out vec4 fragColor;
+
+void main() {
+    fragColor = vec4(p3d_ColorScale.rgb, p3d_ColorScale.a * alpha);
+}
+''')
+
+class UnitRenderer(Entity):
+    """
+    Bodies and health bars of many units in two instanced draw calls, fed
+    from one buffer: position and yaw, hp fraction, bar alpha and a hit
+    flash per unit. Units are any hashable keys; add() them, write their
+    rows with the set_* methods and the buffer is uploaded once per frame.
+    """
+    def __init__(self,
+                 capacity: int = 1024,
+                 body_model='cube',
+                 body_origin=(0, -.5, 0),
+                 body_scale=(1, 2, 1),
+                 body_color=color.light_gray,
+                 flash_color=color.red,
+                 bar_offset=(0, 2.4, 0),
+                 bar_size=(1.5, .1, .1),
+                 bar_color=color.red,
+                 **kwargs
+            ):
+        super().__init__(**kwargs)
+        self.buffer = InstanceBuffer(capacity, texels=2)
+        self.rows = self.buffer.data
+        self.units: List = []
+        self._slot: Dict = {}
+        self._dirty = True
+
+        self.body = InstancedModel(parent=self, model=body_model, buffer=self.buffer, shader=unit_body_shader, color=body_color)
+        self.body.set_shader_input('model_offset', Vec3(*(-v for v in body_origin)))
+        self.body.set_shader_input('model_scale', Vec3(*body_scale))
+        self.body.set_shader_input('flash_color', flash_color)
+        self.bar = InstancedModel(parent=self, model='cube', buffer=self.buffer, shader=unit_bar_shader, color=bar_color)
+        self.bar.set_shader_input('bar_offset', Vec3(*bar_offset))
+        self.bar.set_shader_input('bar_size', Vec3(*bar_size))
+        self.bar.setTransparency(TransparencyAttrib.M_alpha)
+
+    def add(self, unit, position=(0, 0, 0), yaw: float = 0) -> None:
+        slot = len(self.units)
+        if slot >= self.buffer.capacity:
+            raise ValueError(f'UnitRenderer is full ({self.buffer.capacity} units)')
+        self.units.append(unit)
+        self._slot[unit] = slot
+        self.rows[slot] = 0
+        self.rows[slot, 1, 0] = 1
+        self.set_transform(unit, position, yaw)
+
+    def remove(self, unit) -> None:
+        """Drop unit; the last unit's row moves into its slot."""
+        slot = self._slot.pop(unit, None)
+        if slot is None:
+            return
+        last = self.units.pop()
+        if last is not unit:
+            self.units[slot] = last
+            self._slot[last] = slot
+            self.rows[slot] = self.rows[len(self.units)]
+        self._dirty = True
+
+    def set_transform(self, unit, position, yaw: float) -> None:
+        """position in world space, yaw as ursina's rotation_y in degrees."""
+        self.rows[self._slot[unit], 0] = (position[0], position[1], position[2], math.radians(yaw))
+        self._dirty = True
+
+    def set_bar(self, unit, fraction: float, alpha: float) -> None:
+        row = self.rows[self._slot[unit], 1]
+        row[0] = fraction
+        row[1] = alpha
+        self._dirty = True
+
+    def set_flash(self, unit, amount: float) -> None:
+        self.rows[self._slot[unit], 1, 2] = amount
+        self._dirty = True
+
+    def update(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        self.buffer.upload()
+        self.body.show_instances(len(self.units))
+        self.bar.show_instances(len(self.units))
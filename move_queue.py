@@ -0,0 +1,48 @@
+# Pending cube turns, merged as they arrive. Turns of parallel slices commute,
+# so a new turn is folded into an earlier pending turn of the same slice as
+# long as only turns about the same axis lie between them: R R becomes R2,
+# R R' disappears and R L R becomes R2 L.
+
+from typing import Iterator, List
+
+from cube_model import Move
+
+def normalize(turns: int) -> int:
+    """turns as -1, 1 or 2 quarter turns (0 for none)."""
+    return (turns + 1) % 4 - 1 if turns % 4 else 0
+
+class MoveQueue:
+    """First-in first-out (axis, layer, turns) moves with coalescing push()."""
+    def __init__(self):
+        self.moves: List[Move] = []
+        self.merged = 0   # pushes folded into an earlier move
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __iter__(self) -> Iterator[Move]:
+        return iter(self.moves)
+
+    def push(self, move: Move) -> None:
+        axis, layer, turns = move
+        moves = self.moves
+        for i in range(len(moves) - 1, -1, -1):
+            other_axis, other_layer, other_turns = moves[i]
+            if other_axis != axis:
+                break
+            if other_layer == layer:
+                self.merged += 1
+                turns = normalize(other_turns + turns)
+                if turns:
+                    moves[i] = (axis, layer, turns)
+                else:
+                    del moves[i]
+                return
+        if normalize(turns):
+            moves.append((axis, layer, normalize(turns)))
+
+    def pop(self) -> Move:
+        return self.moves.pop(0)
+
+    def clear(self) -> None:
+        self.moves.clear()
@@ -0,0 +1,65 @@
+# Adaptive smoothing for stick and look input (the One Euro filter, Casiez et
+# al. 2012). A low-pass filter whose cutoff rises with the signal's speed:
+# a resting thumb's jitter is averaged away, while a fast flick follows the
+# finger with almost no lag. Each sample costs a few multiplications and the
+# state is two floats per axis.
+
+import math
+from typing import Sequence, Tuple
+
+def _smoothing(cutoff: float, dt: float) -> float:
+    """Exponential smoothing factor for a cutoff frequency in Hz over dt seconds."""
+    tau = 1 / (2 * math.pi * cutoff)
+    return 1 / (1 + tau / dt)
+
+class OneEuroFilter:
+    """
+    One filtered axis. min_cutoff (Hz) sets how hard jitter at rest is
+    smoothed, beta how quickly the cutoff opens up with speed (units per
+    second) and d_cutoff how much the speed estimate itself is smoothed.
+    """
+    __slots__ = ('min_cutoff', 'beta', 'd_cutoff', 'value', 'speed')
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 2.0, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.speed = 0.0
+
+    def reset(self) -> None:
+        self.value = None
+        self.speed = 0.0
+
+    def __call__(self, value: float, dt: float) -> float:
+        """Filter one sample taken dt seconds after the previous one."""
+        if self.value is None or dt <= 0:
+            if self.value is None:
+                self.value = value
+            return self.value
+        speed = (value - self.value) / dt
+        self.speed += _smoothing(self.d_cutoff, dt) * (speed - self.speed)
+        cutoff = self.min_cutoff + self.beta * abs(self.speed)
+        self.value += _smoothing(cutoff, dt) * (value - self.value)
+        return self.value
+
+class StickFilter:
+    """
+    A OneEuroFilter per axis of a stick, or of any input vector. Releasing
+    the stick (every axis exactly zero) resets the filters, so the output
+    stops at once instead of easing out after the finger has lifted.
+    """
+    __slots__ = ('axes',)
+
+    def __init__(self, axes: int = 2, min_cutoff: float = 1.0, beta: float = 2.0, d_cutoff: float = 1.0):
+        self.axes = tuple(OneEuroFilter(min_cutoff, beta, d_cutoff) for _ in range(axes))
+
+    def reset(self) -> None:
+        for axis in self.axes:
+            axis.reset()
+
+    def __call__(self, values: Sequence[float], dt: float) -> Tuple[float, ...]:
+        if not any(values):
+            self.reset()
+            return tuple(0.0 for _ in self.axes)
+        return tuple(axis(value, dt) for axis, value in zip(self.axes, values))
@@ -0,0 +1,98 @@
+# Projectiles as rows of NumPy arrays instead of one Entity each. Every frame
+# all live projectiles are integrated together, their motion segments are
+# checked against a ColliderIndex in one cast_segments() batch, and the
+# survivors are drawn with a single instanced draw call.
+
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from ursina import *
+
+from collision_index import ColliderIndex
+from instancing import InstancedModel
+from ray_batch import cast_segments
+
+class ProjectileSystem(Entity):
+    """
+    Straight-flying (optionally falling) projectiles that expire after
+    lifetime seconds or on their first hit. on_hit(entity, world_point,
+    world_normal) is called for each hit. When full, firing replaces the
+    oldest projectile.
+    """
+    def __init__(self,
+                 collider_index: ColliderIndex,
+                 capacity: int = 4096,
+                 lifetime: float = 1,
+                 gravity: float = 0,
+                 ignore_list: Iterable = (),
+                 on_hit: Optional[Callable] = None,
+                 model='cube',
+                 projectile_scale: float = .1,
+                 color=color.black,
+                 **kwargs
+            ):
+        super().__init__(**kwargs)
+        self.collider_index = collider_index
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.gravity = gravity
+        self.ignore_list = list(ignore_list)   # not 'ignore': ursina skips update() for entities with ignore set
+        self.on_hit = on_hit
+        self.projectile_scale = projectile_scale
+
+        self.count = 0
+        self.positions = np.zeros((capacity, 3))
+        self.velocities = np.zeros((capacity, 3))
+        self.ages = np.zeros(capacity)
+        self.renderer = InstancedModel(parent=self, model=model, capacity=capacity, color=color)
+
+    def fire(self, position, velocity) -> None:
+        self.fire_many(np.array([tuple(position)]), np.array([tuple(velocity)]))
+
+    def fire_many(self, positions: np.ndarray, velocities: np.ndarray) -> None:
+        new = min(len(positions), self.capacity)
+        overflow = self.count + new - self.capacity
+        if overflow > 0:
+            # rows stay in firing order, so the oldest are at the front
+            self._keep(np.arange(self.count) >= overflow)
+        n = self.count
+        self.positions[n:n + new] = positions[:new]
+        self.velocities[n:n + new] = velocities[:new]
+        self.ages[n:n + new] = 0
+        self.count = n + new
+
+    def clear(self) -> None:
+        self.count = 0
+        self.renderer.set_instances(self.positions[:0])
+
+    def update(self) -> None:
+        n = self.count
+        if n:
+            dt = time.dt
+            positions = self.positions[:n]
+            velocities = self.velocities[:n]
+            if self.gravity:
+                velocities[:, 1] -= self.gravity * dt
+            ends = positions + velocities * dt
+            hits = cast_segments(self.collider_index, positions, ends, self.ignore_list)
+            positions[:] = ends
+            self.ages[:n] += dt
+
+            hit_rows = np.flatnonzero(hits.hit)
+            if len(hit_rows):
+                positions[hit_rows] = hits.world_point[hit_rows]
+                if self.on_hit:
+                    for i in hit_rows.tolist():
+                        self.on_hit(hits.entities[hits.entity_index[i]],
+                                    Vec3(*hits.world_point[i]), Vec3(*hits.world_normal[i]))
+            self._keep(~hits.hit & (self.ages[:n] < self.lifetime))
+
+        self.renderer.set_instances(self.positions[:self.count], self.projectile_scale)
+
+    def _keep(self, mask: np.ndarray) -> None:
+        """Compact the live rows to those where mask is True, keeping their order."""
+        kept = int(mask.sum())
+        self.positions[:kept] = self.positions[:self.count][mask]
+        self.velocities[:kept] = self.velocities[:self.count][mask]
+        self.ages[:kept] = self.ages[:self.count][mask]
+        self.count = kept
@@ -0,0 +1,259 @@
+# Batched raycasts. Systems submit rays during the frame and resolve() tests all
+# of them in one pass: a broadphase walk of a ColliderIndex per ray, then one
+# vectorized ray/box slab test over every (ray, candidate) pair. Results are
+# NumPy arrays indexed by the ticket submit() returned.
+
+import math
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from collision_index import ColliderIndex, _aabb_box
+
+_EPSILON = 1e-9
+_CORNERS = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.int64)
+_CELL_BIAS = 1 << 19   # grid cells are packed into one int64 key, 20 bits per axis
+_CELL_SPAN = 1 << 20
+
+class RayBatch:
+    """
+    Collects rays for one resolve() over a ColliderIndex.
+
+    After resolve(), results live in hit (bool), distance, entity_index (int,
+    -1 on a miss, into entities), world_point and world_normal (n x 3), each
+    row matching a ticket from the submits that resolve() consumed. Rays
+    submitted afterwards wait for the next resolve(). Non-box colliders are
+    tested as their bounding box.
+    """
+    def __init__(self, index: ColliderIndex):
+        self.index = index
+        self.generation = 0
+        self._origins: List[Tuple[float, float, float]] = []
+        self._directions: List[Tuple[float, float, float]] = []
+        self._distances: List[float] = []
+        self._ignores: List[Iterable] = []
+
+        self.entities: List = []
+        self.hit = np.zeros(0, dtype=bool)
+        self.distance = np.zeros(0)
+        self.entity_index = np.zeros(0, dtype=np.int64)
+        self.world_point = np.zeros((0, 3))
+        self.world_normal = np.zeros((0, 3))
+
+    def __len__(self) -> int:
+        return len(self._origins)
+
+    def submit(self, origin, direction, distance: float = 9999, ignore: Iterable = ()) -> Tuple[int, int]:
+        """Queue a ray and return its ticket for the next resolve()."""
+        length = math.sqrt(direction[0] ** 2 + direction[1] ** 2 + direction[2] ** 2)
+        self._origins.append((origin[0], origin[1], origin[2]))
+        if length < _EPSILON:
+            self._directions.append((0.0, 0.0, 0.0))   # never hits, like ColliderIndex.raycast
+        else:
+            self._directions.append((direction[0] / length, direction[1] / length, direction[2] / length))
+        self._distances.append(distance)
+        self._ignores.append(ignore)
+        return self.generation + 1, len(self._origins) - 1
+
+    def ready(self, ticket: Optional[Tuple[int, int]]) -> bool:
+        return ticket is not None and ticket[0] == self.generation
+
+    def hit_entity(self, ticket: Optional[Tuple[int, int]]):
+        """The entity a resolved ray hit, or None (also while unresolved)."""
+        if not self.ready(ticket):
+            return None
+        i = self.entity_index[ticket[1]]
+        return self.entities[i] if i >= 0 else None
+
+    def resolve(self) -> None:
+        n = len(self._origins)
+        self.generation += 1
+        origins = np.array(self._origins, dtype=np.float64).reshape(n, 3)
+        directions = np.array(self._directions, dtype=np.float64).reshape(n, 3)
+        distances = np.array(self._distances, dtype=np.float64)
+        ignores = [set(ignored) for ignored in self._ignores]
+        self._origins, self._directions, self._distances, self._ignores = [], [], [], []
+
+        # broadphase: every ray walks the grid once and yields (ray, box) pairs
+        index = self.index
+        column = {}
+        entities = []
+        pair_ray: List[int] = []
+        pair_box: List[int] = []
+        for i in range(n):
+            if not directions[i].any():
+                continue
+            ignored = ignores[i]
+            for entity in index.hash.query_ray(self._as_tuple(origins[i]), self._as_tuple(directions[i]), distances[i]):
+                if entity in ignored or not entity.enabled:
+                    continue
+                j = column.get(entity)
+                if j is None:
+                    j = column[entity] = len(entities)
+                    entities.append(entity)
+                pair_ray.append(i)
+                pair_box.append(j)
+        self.entities = entities
+        (self.hit, self.distance, self.entity_index,
+         self.world_point, self.world_normal) = _nearest_hits(index, entities, origins, directions, distances,
+                                                              np.array(pair_ray, dtype=np.int64),
+                                                              np.array(pair_box, dtype=np.int64))
+
+    @staticmethod
+    def _as_tuple(row) -> Tuple[float, float, float]:
+        return float(row[0]), float(row[1]), float(row[2])
+
+class SegmentHits(NamedTuple):
+    """Per-segment results of cast_segments(); rows follow the input order."""
+    hit: np.ndarray            # bool
+    distance: np.ndarray       # along the segment, its length on a miss
+    entity_index: np.ndarray   # into entities, -1 on a miss
+    world_point: np.ndarray    # n x 3
+    world_normal: np.ndarray   # n x 3
+    entities: List
+
+def cast_segments(index: ColliderIndex, starts: np.ndarray, ends: np.ndarray, ignore: Iterable = ()) -> SegmentHits:
+    """
+    First collider hit along each segment starts[i] -> ends[i], all in one
+    batch. Meant for many short segments, such as one frame of projectile
+    motion: segments shorter than a grid cell are matched to colliders by
+    the cells their bounds touch, with each distinct cell looked up once
+    rather than once per segment. Longer ones walk the grid like rays.
+    """
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    deltas = np.asarray(ends, dtype=np.float64).reshape(-1, 3) - starts
+    n = len(starts)
+    distances = np.sqrt((deltas * deltas).sum(axis=1))
+    moving = distances > _EPSILON
+    directions = np.zeros_like(deltas)
+    directions[moving] = deltas[moving] / distances[moving, None]
+
+    grid = index.hash
+    ignored = set(ignore)
+    column = {}
+    entities = []
+
+    def columns(bucket) -> List[int]:
+        found = []
+        for entity in bucket:
+            if entity in ignored or not entity.enabled:
+                continue
+            j = column.get(entity)
+            if j is None:
+                j = column[entity] = len(entities)
+                entities.append(entity)
+            found.append(j)
+        return found
+
+    ray_parts: List[np.ndarray] = []
+    box_parts: List[np.ndarray] = []
+
+    size = grid.cell_size
+    low_cell = np.floor(np.minimum(starts, starts + deltas) / size).astype(np.int64)
+    high_cell = np.floor(np.maximum(starts, starts + deltas) / size).astype(np.int64)
+    short = moving & ((high_cell - low_cell) <= 1).all(axis=1)
+
+    # short segments: each touches at most the 2 x 2 x 2 cells from its low corner
+    rows = np.flatnonzero(short)
+    if len(rows):
+        cells = low_cell[rows, None, :] + _CORNERS[None, :, :]                    # s x 8 x 3
+        inside = (cells <= high_cell[rows, None, :]).all(axis=2).ravel()
+        cell_rows = np.repeat(rows, 8)[inside]
+        cells = cells.reshape(-1, 3)[inside] + _CELL_BIAS
+        keys = (cells[:, 0] * _CELL_SPAN + cells[:, 1]) * _CELL_SPAN + cells[:, 2]
+        unique_keys, group = np.unique(keys, return_inverse=True)
+        group = group.ravel()
+
+        # colliders of each distinct cell, flattened: cell u owns flat[offsets[u]:offsets[u + 1]]
+        flat: List[int] = []
+        offsets = [0]
+        decoded = np.stack((unique_keys // (_CELL_SPAN * _CELL_SPAN),
+                            unique_keys // _CELL_SPAN % _CELL_SPAN,
+                            unique_keys % _CELL_SPAN), axis=1) - _CELL_BIAS
+        for cell in decoded.tolist():
+            bucket = grid.cells.get(tuple(cell))
+            if bucket:
+                flat.extend(columns(bucket))
+            offsets.append(len(flat))
+
+        # one (segment, collider) pair per collider in each cell the segment touches
+        if flat:
+            offsets = np.array(offsets, dtype=np.int64)
+            counts = (offsets[1:] - offsets[:-1])[group]
+            total = int(counts.sum())
+            first = np.repeat(offsets[:-1][group] - (np.cumsum(counts) - counts), counts)
+            ray_parts.append(np.repeat(cell_rows, counts))
+            box_parts.append(np.array(flat, dtype=np.int64)[first + np.arange(total)])
+
+    # long segments walk the grid like rays
+    for i in np.flatnonzero(moving & ~short).tolist():
+        found = columns(grid.query_ray(tuple(starts[i].tolist()), tuple(directions[i].tolist()), distances[i]))
+        if found:
+            ray_parts.append(np.full(len(found), i, dtype=np.int64))
+            box_parts.append(np.array(found, dtype=np.int64))
+
+    pair_ray = np.concatenate(ray_parts) if ray_parts else np.zeros(0, dtype=np.int64)
+    pair_box = np.concatenate(box_parts) if box_parts else np.zeros(0, dtype=np.int64)
+    return SegmentHits(*_nearest_hits(index, entities, starts, directions, distances, pair_ray, pair_box), entities)
+
+def _nearest_hits(index: ColliderIndex, entities: List, origins: np.ndarray, directions: np.ndarray,
+                  distances: np.ndarray, ray: np.ndarray, box: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Narrow phase shared by RayBatch and cast_segments(): a slab test on every
+    (ray, box) pair at once, in each box's local frame, keeping the nearest
+    hit per ray. Returns hit, distance, entity_index, world_point, world_normal.
+    """
+    n = len(origins)
+    hit = np.zeros(n, dtype=bool)
+    distance = distances.copy()
+    entity_index = np.full(n, -1, dtype=np.int64)
+    world_point = np.zeros((n, 3))
+    world_normal = np.zeros((n, 3))
+    if not len(ray):
+        return hit, distance, entity_index, world_point, world_normal
+
+    boxes = [index.boxes[e] or _aabb_box(*index.hash.bounds[e]) for e in entities]
+    centers = np.array([b.center for b in boxes], dtype=np.float64)           # m x 3
+    axes = np.array([b.axes for b in boxes], dtype=np.float64)                # m x 3 x 3
+    halves = np.array([b.half_extents for b in boxes], dtype=np.float64)      # m x 3
+
+    pair_axes = axes[box]                                                     # k x 3 x 3
+    half = halves[box]
+    e = np.einsum('kaj,kj->ka', pair_axes, origins[ray] - centers[box])
+    f = np.einsum('kaj,kj->ka', pair_axes, directions[ray])
+    parallel = np.abs(f) < _EPSILON
+    inverse = 1.0 / np.where(parallel, 1.0, f)
+    t1 = (-half - e) * inverse
+    t2 = (half - e) * inverse
+    inside_slab = np.abs(e) <= half
+    near_axis = np.where(parallel, np.where(inside_slab, -np.inf, np.inf), np.minimum(t1, t2))
+    far_axis = np.where(parallel, np.where(inside_slab, np.inf, -np.inf), np.maximum(t1, t2))
+
+    t_near = near_axis.max(axis=1)
+    t_far = far_axis.min(axis=1)
+    starts_inside = t_near < 0
+    # like ursina's raycast(), a ray starting inside a box hits its exit
+    t = np.where(starts_inside, t_far, t_near)
+    valid = (t_near <= t_far) & (t_far >= 0) & (t <= distances[ray])
+    if not valid.any():
+        return hit, distance, entity_index, world_point, world_normal
+
+    # nearest valid pair per ray
+    candidates = np.flatnonzero(valid)
+    order = candidates[np.lexsort((t[candidates], ray[candidates]))]
+    rays, first = np.unique(ray[order], return_index=True)
+    best = order[first]
+    best_t = t[best]
+
+    # normal of the face crossed: the entering axis, or the exiting one from inside
+    inside = starts_inside[best]
+    face_axis = np.where(inside, far_axis[best].argmin(axis=1), near_axis[best].argmax(axis=1))
+    face_sign = np.sign(f[best, face_axis])
+    face_sign = np.where(inside, face_sign, -face_sign)
+
+    hit[rays] = True
+    distance[rays] = best_t
+    entity_index[rays] = box[best]
+    world_point[rays] = origins[rays] + directions[rays] * best_t[:, None]
+    world_normal[rays] = pair_axes[best, face_axis] * face_sign[:, None]
+    return hit, distance, entity_index, world_point, world_normal
@@ -1,6 +1,8 @@
 from ursina import *
 from ursina.prefabs.draggable import Draggable
 
+from one_euro import StickFilter
+
 # ———————————————————————————————————————
 # On-Screen Controls
 # ———————————————————————————————————————
@@ -44,6 +46,46 @@ class VirtualButton(Button):
         self.is_pressed = False
         return True
 
+# ———————————————————————————————————————
+# 6-DOF Controller
+# ———————————————————————————————————————
+class SixDOFController(Entity):
+    """
+    A free-flying pivot. Orientation is kept as a quaternion, so there are no
+    Euler angles to gimbal-lock. Each frame it turns by `turn` (pitch, yaw
+    and roll rates, -1..1) about its own axes and moves by `move` (right, up
+    and forward, -1..1) along them. The result is written with one setPosQuat.
+    Assign `orientation` (a Quat) rather than rotation to turn it from code.
+    Both inputs pass through per-axis One Euro filters first; set move_filter
+    or turn_filter to None for raw input.
+    """
+    def __init__(self, move_speed=4, rot_speed=100, **kwargs):
+        super().__init__(**kwargs)
+        self.move_speed = move_speed
+        self.rot_speed  = rot_speed      # degrees per second at full input
+        self.move = Vec3(0,0,0)
+        self.turn = Vec3(0,0,0)
+        self.orientation = Quat(self.getQuat())
+        self.move_filter = StickFilter(3)
+        self.turn_filter = StickFilter(3)
+
+    def update(self):
+        dt = time.dt
+        move = Vec3(*self.move_filter(self.move, dt)) if self.move_filter else self.move
+        turn = Vec3(*self.turn_filter(self.turn, dt)) if self.turn_filter else self.turn
+        # angular velocity in local axes; ursina's rotation_z turns the other way to panda's
+        spin = Vec3(turn.x, turn.y, -turn.z) * self.rot_speed * dt
+        angle = spin.length()
+        if angle:
+            delta = Quat()
+            delta.setFromAxisAngle(angle, spin / angle)
+            self.orientation = delta * self.orientation   # delta first: about local axes
+            self.orientation.normalize()
+        position = self.getPos()
+        if move != Vec3(0,0,0):
+            position += self.orientation.xform(move) * self.move_speed * dt
+        self.setPosQuat(position, self.orientation)
+
 # ———————————————————————————————————————
 # Main App
 # ———————————————————————————————————————
@@ -56,7 +98,7 @@ if __name__ == '__main__':
     Entity(model='cube', color=color.azure, scale=1)
 
     # 2) Camera pivot to allow full rotation & translation
-    pivot = Entity()
+    pivot = SixDOFController(move_speed=4, rot_speed=100)
     camera.parent   = pivot
     camera.position = Vec3(0,0,-5)
     camera.look_at(Vec3(0,0,0))
@@ -73,30 +115,21 @@ if __name__ == '__main__':
     btn_roll_ccw = VirtualButton(text='q', position=(.7,-.1), color=color.cyan)
     btn_roll_cw  = VirtualButton(text='e', position=(.8,-.1), color=color.yellow)
 
-    move_speed = 4
-    rot_speed  = 100
-
     def update():
         # refresh joysticks
         joy_move.update()
         joy_look.update()
 
-        dt = time.dt
-
-        # --- Translation
-        tx = joy_move.value.x           # X-axis
-        ty = joy_move.value.y           # Y-axis
+        # --- Translation, along the pivot's own axes
+        tx = joy_move.value.x           # right
+        ty = joy_move.value.y           # up
         tz = int(btn_forward.is_pressed) - int(btn_backward.is_pressed)
+        pivot.move = Vec3(tx, ty, tz)
 
-        pivot.position += Vec3(tx, ty, tz) * dt * move_speed
-
-        # --- Rotation
-        yaw   = joy_look.value.x        # yaw about world-up
-        pitch = joy_look.value.y        # pitch about local-right
+        # --- Rotation, about the pivot's own axes; the pivot integrates both
+        yaw   = joy_look.value.x
+        pitch = joy_look.value.y
         roll  = int(btn_roll_cw.is_pressed) - int(btn_roll_ccw.is_pressed)
-
-        pivot.rotation_y += yaw   * dt * rot_speed
-        pivot.rotation_x += pitch * dt * rot_speed
-        pivot.rotation_z += roll  * dt * rot_speed
+        pivot.turn = Vec3(pitch, yaw, roll)
 
     app.run()
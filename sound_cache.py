@@ -0,0 +1,139 @@
+# Pre-rendered ursfx() sound effects. ursfx() builds a looping Audio entity and
+# five volume/pitch tweens on every call; SoundCache instead renders the whole
+# effect once into a WAV, on a worker thread, and replays it. Variants are
+# keyed by the ursfx parameters, with pitch rounded to pitch_step so randomized
+# pitches map onto a small bank, and the least recently played are evicted.
+
+import tempfile
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from panda3d.core import Filename
+from ursina import *
+from ursina.prefabs.ursfx import ursfx
+
+SEMITONE = 1.05946309436
+
+def load_wave(name: str) -> Tuple[np.ndarray, int]:
+    """Samples (float, -1..1, mono) and sample rate of one of ursina's ursfx waves."""
+    with wave.open(str(application.internal_audio_folder / f'{name}.wav')) as file:
+        rate = file.getframerate()
+        channels = file.getnchannels()
+        data = np.frombuffer(file.readframes(file.getnframes()), dtype=np.int16)
+    samples = data.reshape(-1, channels).mean(axis=1) / 32768
+    return samples, rate
+
+def render_ursfx(samples: np.ndarray, rate: int, volume_curve: List[Tuple[float, float]],
+                 volume: float = .75, pitch: float = 0, pitch_change: float = 0, speed: float = 1,
+                 pitch_curve: Callable[[float], float] = curve.linear) -> np.ndarray:
+    """
+    What ursfx() plays, as int16 samples: the looping wave resampled along the
+    pitch bend and multiplied by the piecewise-linear volume envelope.
+    """
+    times = [point[0] / speed for point in volume_curve]
+    levels = [point[1] * volume for point in volume_curve]
+    duration = times[4]                        # ursfx stops at the fifth point
+    t = np.arange(int(duration * rate)) / rate
+    envelope = np.interp(t, times, levels)
+
+    # ursfx bends the playback rate over the third point's time
+    start_rate = SEMITONE ** pitch
+    end_rate = SEMITONE ** (pitch + pitch_change)
+    bend = times[len(volume_curve) - 3]
+    progress = np.clip(t / bend, 0, 1) if bend > 0 else np.ones_like(t)
+    if pitch_curve is not curve.linear:
+        progress = np.vectorize(pitch_curve)(progress)
+    playback_rate = start_rate + (end_rate - start_rate) * progress
+
+    position = np.cumsum(playback_rate) % len(samples)
+    index = position.astype(np.int64)
+    fraction = position - index
+    signal = samples[index] * (1 - fraction) + samples[(index + 1) % len(samples)] * fraction
+    return np.clip(signal * envelope * 32767, -32768, 32767).astype(np.int16)
+
+class SoundCache:
+    """
+    LRU bank of rendered ursfx() variants. play() takes ursfx's arguments and
+    plays a cached variant; a variant that is not ready yet is queued for the
+    worker and this one call falls back to ursfx(). prefetch() warms the bank.
+    """
+    def __init__(self, max_variants: int = 16, voices: int = 3, pitch_step: float = .25):
+        self.max_variants = max_variants
+        self.voices = voices            # overlapping plays of one variant
+        self.pitch_step = pitch_step
+        self.folder = tempfile.TemporaryDirectory(prefix='sound_cache_')
+        self.variants: 'OrderedDict[tuple, List]' = OrderedDict()   # key -> [sounds, next voice, path]
+        self._pending: Dict[tuple, Future] = {}
+        self._waves: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sound_cache')
+        self._serial = 0
+
+    def key(self, volume_curve, volume=.75, wave='sine', pitch=0, pitch_change=0, speed=1,
+            pitch_curve=curve.linear) -> tuple:
+        pitch = round(pitch / self.pitch_step) * self.pitch_step
+        return (tuple(map(tuple, volume_curve)), volume, wave, pitch, pitch_change, speed, pitch_curve)
+
+    def prefetch(self, volume_curve, **kwargs) -> None:
+        """Render a variant on the worker thread unless it is cached or queued."""
+        key = self.key(volume_curve, **kwargs)
+        if key not in self.variants and key not in self._pending:
+            self._serial += 1
+            path = Path(self.folder.name) / f'{self._serial}.wav'
+            self._pending[key] = self._executor.submit(self._render, key, path)
+
+    def play(self, volume_curve, **kwargs) -> None:
+        key = self.key(volume_curve, **kwargs)
+        variant = self.variants.get(key) or self._finish(key)
+        if not variant:
+            self.prefetch(volume_curve, **kwargs)
+            ursfx(volume_curve, **kwargs)
+            return
+        self.variants.move_to_end(key)
+        sounds, voice, path = variant
+        sound = sounds[voice]
+        variant[1] = (voice + 1) % len(sounds)
+        sound.stop()
+        sound.play()
+
+    def clear(self) -> None:
+        while self.variants:
+            self._evict()
+
+    def _finish(self, key: tuple):
+        """Load a variant the worker has rendered, evicting to stay in budget."""
+        future = self._pending.get(key)
+        if not future or not future.done():
+            return None
+        del self._pending[key]
+        path = future.result()
+        filename = Filename.fromOsSpecific(str(path))
+        sounds = [loader.loadSfx(filename) for _ in range(self.voices)]
+        for sound in sounds:
+            sound.setVolume(Audio.volume_multiplier)
+        self.variants[key] = variant = [sounds, 0, path]
+        while len(self.variants) > self.max_variants:
+            self._evict()
+        return variant
+
+    def _evict(self) -> None:
+        key, (sounds, voice, path) = self.variants.popitem(last=False)
+        for sound in sounds:
+            sound.stop()
+        Path(path).unlink(missing_ok=True)
+
+    def _render(self, key: tuple, path: Path) -> Path:
+        volume_curve, volume, wave_name, pitch, pitch_change, speed, pitch_curve = key
+        if wave_name not in self._waves:
+            self._waves[wave_name] = load_wave(wave_name)
+        samples, rate = self._waves[wave_name]
+        data = render_ursfx(samples, rate, volume_curve, volume, pitch, pitch_change, speed, pitch_curve)
+        with wave.open(str(path), 'wb') as file:
+            file.setnchannels(1)
+            file.setsampwidth(2)
+            file.setframerate(rate)
+            file.writeframes(data.tobytes())
+        return path
@@ -0,0 +1,214 @@
+# Proximity queries over entity positions. Entities are bucketed by position
+# in a uniform grid, so "who is within r", "who is nearest" and "who is inside
+# this view cone" only look at the cells around the query instead of scanning
+# every entity and computing a distance to each.
+
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+Vector = Tuple[float, float, float]
+Cell = Tuple[int, int, int]
+
+class TargetIndex:
+    """
+    Uniform grid of entity world positions. Call update(entity) after moving
+    an indexed entity (only a change of cell touches the grid) and remove()
+    before destroying one. predicate, where accepted, filters the entities found.
+    """
+    def __init__(self, cell_size: float = 8.0):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[Hashable]] = {}
+        self.positions: Dict[Hashable, Vector] = {}
+        self._cell_of: Dict[Hashable, Cell] = {}
+        self._extent: Optional[Tuple[Cell, Cell]] = None   # occupied cells, rebuilt lazily
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, entity) -> bool:
+        return entity in self.positions
+
+    def _cell(self, position: Vector) -> Cell:
+        size = self.cell_size
+        return (math.floor(position[0] / size), math.floor(position[1] / size), math.floor(position[2] / size))
+
+    def add(self, entity, position: Optional[Vector] = None) -> None:
+        self.update(entity, position)
+
+    def add_entities(self, entities) -> None:
+        for entity in entities:
+            self.add(entity)
+
+    def update(self, entity, position: Optional[Vector] = None) -> None:
+        """Insert or move entity, by default to its world_position."""
+        if position is None:
+            position = entity.world_position
+        position = (position[0], position[1], position[2])
+        cell = self._cell(position)
+        old = self._cell_of.get(entity)
+        if old != cell:
+            if old is not None:
+                self._discard(entity, old)
+            if cell not in self.cells:
+                self.cells[cell] = set()
+                self._extent = None
+            self.cells[cell].add(entity)
+            self._cell_of[entity] = cell
+        self.positions[entity] = position
+
+    def remove(self, entity) -> None:
+        cell = self._cell_of.pop(entity, None)
+        if cell is not None:
+            self._discard(entity, cell)
+        self.positions.pop(entity, None)
+
+    def _discard(self, entity, cell: Cell) -> None:
+        bucket = self.cells[cell]
+        bucket.discard(entity)
+        if not bucket:
+            del self.cells[cell]
+            self._extent = None
+
+    def query_radius(self, center: Vector, radius: float,
+                     predicate: Optional[Callable] = None) -> List:
+        """Entities within radius of center, in no particular order."""
+        lo = self._cell(tuple(center[i] - radius for i in range(3)))
+        hi = self._cell(tuple(center[i] + radius for i in range(3)))
+        cx, cy, cz = center[0], center[1], center[2]
+        limit = radius * radius
+        found = []
+        cells, positions = self.cells, self.positions
+        for x in range(lo[0], hi[0] + 1):
+            for y in range(lo[1], hi[1] + 1):
+                for z in range(lo[2], hi[2] + 1):
+                    bucket = cells.get((x, y, z))
+                    if not bucket:
+                        continue
+                    for entity in bucket:
+                        p = positions[entity]
+                        if (p[0] - cx) ** 2 + (p[1] - cy) ** 2 + (p[2] - cz) ** 2 <= limit \
+                           and (predicate is None or predicate(entity)):
+                            found.append(entity)
+        return found
+
+    def nearest(self, center: Vector, max_distance: float = math.inf,
+                predicate: Optional[Callable] = None):
+        """The closest entity to center within max_distance, or None."""
+        if not self.cells:
+            return None
+        size = self.cell_size
+        origin = self._cell(center)
+        lo, hi = self._occupied_extent()
+        reach = max(max(origin[i] - lo[i], hi[i] - origin[i]) for i in range(3))
+        if max_distance < math.inf:
+            reach = min(reach, math.ceil(max_distance / size))
+
+        best, best_distance = None, max_distance * max_distance
+        cells, positions = self.cells, self.positions
+        for ring in range(reach + 1):
+            for cell in _shell(origin, ring):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for entity in bucket:
+                    p = positions[entity]
+                    d = (p[0] - center[0]) ** 2 + (p[1] - center[1]) ** 2 + (p[2] - center[2]) ** 2
+                    if d <= best_distance and (predicate is None or predicate(entity)):
+                        best, best_distance = entity, d
+            # everything in the next shell is at least ring * cell_size away
+            if best is not None and (ring * size) ** 2 >= best_distance:
+                break
+        return best
+
+    def _occupied_extent(self) -> Tuple[Cell, Cell]:
+        if self._extent is None:
+            keys = self.cells.keys()
+            self._extent = (tuple(min(cell[i] for cell in keys) for i in range(3)),
+                            tuple(max(cell[i] for cell in keys) for i in range(3)))
+        return self._extent
+
+    def query_cone(self, origin: Vector, direction: Vector, angle: float, max_distance: float,
+                   predicate: Optional[Callable] = None) -> List:
+        """
+        Entities within max_distance of origin and within angle degrees of
+        direction, the most centred first. Only cells inside the cone's
+        bounding box that the cone can reach are visited.
+        """
+        length = math.sqrt(direction[0] ** 2 + direction[1] ** 2 + direction[2] ** 2)
+        if length == 0 or not self.cells:
+            return []
+        d = (direction[0] / length, direction[1] / length, direction[2] / length)
+        spread = math.radians(angle)
+        cos_limit = math.cos(spread)
+        size = self.cell_size
+
+        # bounding box of the spherical sector, clipped to the occupied cells
+        occupied_lo, occupied_hi = self._occupied_extent()
+        lo, hi = [], []
+        for i in range(3):
+            low = origin[i] - max_distance * _reach(-d[i], spread)
+            high = origin[i] + max_distance * _reach(d[i], spread)
+            lo.append(max(occupied_lo[i], math.floor(low / size)) if math.isfinite(low) else occupied_lo[i])
+            hi.append(min(occupied_hi[i], math.floor(high / size)) if math.isfinite(high) else occupied_hi[i])
+        if any(lo[i] > hi[i] for i in range(3)):
+            return []
+
+        volume = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if volume > len(self.cells):
+            candidates = [(cell, bucket) for cell, bucket in self.cells.items()
+                          if all(lo[i] <= cell[i] <= hi[i] for i in range(3))]
+        else:
+            cells = self.cells
+            candidates = [((x, y, z), cells[(x, y, z)])
+                          for x in range(lo[0], hi[0] + 1)
+                          for y in range(lo[1], hi[1] + 1)
+                          for z in range(lo[2], hi[2] + 1)
+                          if (x, y, z) in cells]
+
+        ox, oy, oz = origin[0], origin[1], origin[2]
+        cell_radius = size * math.sqrt(3) / 2
+        limit = max_distance * max_distance
+        positions = self.positions
+        scored = []
+        for cell, bucket in candidates:
+            # skip cells whose bounding sphere misses the cone
+            vx, vy, vz = (cell[0] + .5) * size - ox, (cell[1] + .5) * size - oy, (cell[2] + .5) * size - oz
+            distance = math.sqrt(vx * vx + vy * vy + vz * vz)
+            if distance > max_distance + cell_radius:
+                continue
+            if distance > cell_radius:
+                cos_cell = max(-1.0, min(1.0, (vx * d[0] + vy * d[1] + vz * d[2]) / distance))
+                if math.acos(cos_cell) > spread + math.asin(cell_radius / distance):
+                    continue
+            for entity in bucket:
+                p = positions[entity]
+                vx, vy, vz = p[0] - ox, p[1] - oy, p[2] - oz
+                squared = vx * vx + vy * vy + vz * vz
+                if squared == 0 or squared > limit:
+                    continue
+                distance = math.sqrt(squared)
+                cos_angle = (vx * d[0] + vy * d[1] + vz * d[2]) / distance
+                if cos_angle >= cos_limit and (predicate is None or predicate(entity)):
+                    scored.append((-cos_angle, distance, entity))
+        scored.sort(key=lambda item: (item[0], item[1]))
+        return [entity for _, _, entity in scored]
+
+def _reach(cos_axis: float, spread: float) -> float:
+    """
+    How far along an axis, per unit of length, a cone of half-angle spread
+    around a direction reaches; cos_axis is the direction's component on it.
+    """
+    gap = max(0.0, math.acos(max(-1.0, min(1.0, cos_axis))) - spread)
+    return max(0.0, math.cos(gap))
+
+def _shell(origin: Cell, ring: int):
+    """Cells at Chebyshev distance ring from origin."""
+    ox, oy, oz = origin
+    if ring == 0:
+        yield origin
+        return
+    for x in range(-ring, ring + 1):
+        for y in range(-ring, ring + 1):
+            edge = abs(x) == ring or abs(y) == ring
+            for z in ((range(-ring, ring + 1)) if edge else (-ring, ring)):
+                yield (ox + x, oy + y, oz + z)
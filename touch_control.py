@@ -3,41 +3,49 @@
 from ursina import *
 from ursina.prefabs.draggable import Draggable
 
+from input_core import ButtonState, JoystickState
+
 
 # ———————————————————————————————————————
 # On‑Screen Controls
 # ———————————————————————————————————————
 
 class VirtualJoystick(Entity):
-    """An on-screen joystick for touch input."""
+    """An on-screen joystick for touch input, drawn over a JoystickState."""
     def __init__(self, radius=80, position=(0,0), **kwargs):
         super().__init__(parent=camera.ui, position=position, scale=(.2, .2), **kwargs)
-        # convert pixel radius to UI space
-        self.radius = radius / 100
+        # clamping and the -1..+1 value live in the state; no dead zone here
+        self.state = JoystickState(radius, dead_zone=0)
         self.bg = Entity(parent=self, model='circle', color=color.dark_gray, scale=2)
         self.knob = Draggable(parent=self, model='circle', color=color.white, scale=1)
         self.knob.always_on_top = True
         self.knob.start_position = self.knob.position
-        self.value = Vec2(0,0)
+
+    @property
+    def radius(self):
+        # in UI space, the state keeps the pixel radius
+        return self.state.radius / 100
+
+    @radius.setter
+    def radius(self, value):
+        self.state.radius = value * 100
+
+    @property
+    def value(self):
+        return Vec2(self.state.x, self.state.y)
 
     def update(self):
         if self.knob.dragging:
-            # get 2D offset
-            off = Vec2(self.knob.position.x, self.knob.position.y)
-            # clamp to radius
-            if off.length() > self.radius:
-                off = off.normalized() * self.radius
+            x, y = self.state.drag_to(self.knob.position.x, self.knob.position.y)
             # reposition knob (preserve z)
-            self.knob.position = Vec3(off.x, off.y, self.knob.position.z)
-            # normalize −1..+1
-            self.value = off / self.radius
+            self.knob.position = Vec3(x, y, self.knob.position.z)
         else:
             self.knob.position = self.knob.start_position
-            self.value = Vec2(0,0)
+            self.state.release()
 
 
 class VirtualButton(Button):
-    """An on-screen button that updates held_keys[key_name]."""
+    """An on-screen button over a ButtonState that also updates held_keys[key_name]."""
     def __init__(self, key_name, position=(0,0), color=color.azure, **kwargs):
         super().__init__(
             parent=camera.ui,
@@ -48,15 +56,29 @@ class VirtualButton(Button):
             scale=.1,
             **kwargs
         )
-        self.key_name = key_name
+        self.state = ButtonState(key_name)
+
+    @property
+    def key_name(self):
+        return self.state.key_name
+
+    @key_name.setter
+    def key_name(self, value):
+        self.state.key_name = value
+
+    @property
+    def is_pressed(self):
+        return self.state.is_pressed
 
     def on_press(self):
         held_keys[self.key_name] = 1
+        self.state.press()
         invoke(lambda: input(self.key_name), delay=0)
         return True  # consume the event
 
     def on_release(self):
         held_keys[self.key_name] = 0
+        self.state.release()
         invoke(lambda: input(f'{self.key_name} up'), delay=0)
         return True
 
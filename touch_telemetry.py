@@ -0,0 +1,121 @@
+# Where players touch, to tune control placement. Each control gets a binned
+# heatmap of touch points in its own space and a few usage counters, all kept
+# in memory. Flushing copies the bins on the calling thread (a memcpy per
+# control) and leaves serializing and writing to a worker thread, so telemetry
+# never stalls a frame. Like input_core, nothing here imports ursina.
+
+import atexit
+import json
+import os
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+TELEMETRY_VERSION = 1
+
+class TouchTelemetry:
+    """
+    Per-control touch heatmaps and counters. record() bins a touch at (x, y)
+    in -extent..extent and counts it; count() bumps any other counter. The
+    JSON file at path is rewritten with everything recorded so far every
+    flush_interval seconds, from update(), and once more by close() or at
+    exit. Heatmaps are saved as bins rows of bins counts, bottom row first.
+    """
+    def __init__(self, path: Union[str, Path] = 'touch_telemetry.json', bins: int = 32,
+                 extent: float = 1.0, flush_interval: float = 30.0):
+        self.path = Path(path)
+        self.bins = bins
+        self.extent = extent
+        self.flush_interval = flush_interval
+        self.heatmaps: Dict[str, array] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+        self._started = time.time()
+        self._last_flush = time.perf_counter()
+        self._pending: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='touch_telemetry')
+        atexit.register(self.close)
+
+    def record(self, control: str, x: float, y: float) -> None:
+        """Count a touch on control at (x, y) in the control's own space."""
+        heatmap = self.heatmaps.get(control)
+        if heatmap is None:
+            heatmap = self.heatmaps[control] = array('I', bytes(4 * self.bins * self.bins))
+        last = self.bins - 1
+        scale = self.bins / (2 * self.extent)
+        column = min(max(int((x + self.extent) * scale), 0), last)
+        row = min(max(int((y + self.extent) * scale), 0), last)
+        heatmap[row * self.bins + column] += 1
+        self.count(control, 'touches')
+
+    def count(self, control: str, event: str, amount: float = 1) -> None:
+        counters = self.counters.get(control)
+        if counters is None:
+            counters = self.counters[control] = {}
+        counters[event] = counters.get(event, 0) + amount
+
+    def heatmap(self, control: str) -> List[List[int]]:
+        """control's touch counts as rows, bottom row first."""
+        heatmap = self.heatmaps.get(control) or array('I', bytes(4 * self.bins * self.bins))
+        return [heatmap[row:row + self.bins].tolist() for row in range(0, len(heatmap), self.bins)]
+
+    def update(self) -> None:
+        """Call once a frame; flushes when flush_interval has passed."""
+        if time.perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> Optional[Future]:
+        """
+        Write everything recorded so far in the background and return the
+        worker's future. A flush still in progress is not queued behind.
+        """
+        self._last_flush = time.perf_counter()
+        if self._pending and not self._pending.done():
+            return self._pending
+        snapshot = self._snapshot()
+        try:
+            self._pending = self._executor.submit(self._write, snapshot)
+        except RuntimeError:   # executor already shut down
+            self._write(snapshot)
+            return None
+        return self._pending
+
+    def close(self) -> None:
+        """Write a final snapshot, waiting for it, and stop the worker."""
+        if self._pending:
+            self._pending.result()
+        self._executor.shutdown(wait=True)
+        self._write(self._snapshot())
+        atexit.unregister(self.close)
+
+    def _snapshot(self) -> dict:
+        return {
+            'heatmaps': {control: array('I', heatmap) for control, heatmap in self.heatmaps.items()},
+            'counters': {control: dict(counters) for control, counters in self.counters.items()},
+            'saved': time.time(),
+        }
+
+    def _write(self, snapshot: dict) -> Path:
+        bins = self.bins
+        controls = {}
+        for control in set(snapshot['heatmaps']) | set(snapshot['counters']):
+            heatmap = snapshot['heatmaps'].get(control)
+            controls[control] = {
+                'counters': snapshot['counters'].get(control, {}),
+                'heatmap': [heatmap[row:row + bins].tolist() for row in range(0, len(heatmap), bins)]
+                           if heatmap else None,
+            }
+        data = {
+            'version': TELEMETRY_VERSION,
+            'bins': bins,
+            'extent': self.extent,
+            'started': self._started,
+            'saved': snapshot['saved'],
+            'controls': controls,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(data, separators=(',', ':')))
+        os.replace(temporary, self.path)
+        return self.path
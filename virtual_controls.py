@@ -0,0 +1,162 @@
+from typing import Callable, List, Optional
+from ursina import *
+from ursina.prefabs.draggable import Draggable
+
+from callback_dispatcher import CallbackDispatcher
+from input_core import ButtonState, JoystickState
+from touch_telemetry import TouchTelemetry
+
+def _touch_point(entity: Entity) -> Optional[Vec2]:
+    """Where the pointer is on entity, -1..1 across its quad, if it is over it."""
+    if mouse.hovered_entity != entity or mouse.point is None:
+        return None
+    return Vec2(mouse.point.x * 2, mouse.point.y * 2)
+
+class VirtualJoystick(Entity):
+    def __init__(self, 
+                 radius: int = 80, 
+                 position: tuple = (-.7, -.4), 
+                 sensitivity: float = 1.0, 
+                 dead_zone: float = 0.05, 
+                 state: Optional[JoystickState] = None,
+                 telemetry: Optional[TouchTelemetry] = None,
+                 name: str = 'joystick',
+                 **kwargs
+            ):
+        super().__init__(parent=camera.ui, 
+                         position=position, 
+                         scale=(.2, .2), 
+                         **kwargs
+                    )
+        self.state = state if state else JoystickState(radius, sensitivity, dead_zone)
+        self.bg = Entity(parent=self, model='circle', color=color.dark_gray, scale=2)
+        self.knob = Draggable(parent=self, model='circle', color=color.white, scale=1)
+        self.knob.always_on_top = True
+        self.knob.start_position = self.knob.position
+        self.telemetry = telemetry   # records where the knob is grabbed, keyed by name
+        self.name = name
+        self._drag_started = None
+
+    @property
+    def radius(self) -> float:
+        return self.state.radius
+
+    @radius.setter
+    def radius(self, value: float) -> None:
+        self.state.radius = value
+
+    @property
+    def sensitivity(self) -> float:
+        return self.state.sensitivity
+
+    @sensitivity.setter
+    def sensitivity(self, value: float) -> None:
+        self.state.sensitivity = value
+
+    @property
+    def dead_zone(self) -> float:
+        return self.state.dead_zone
+
+    @dead_zone.setter
+    def dead_zone(self, value: float) -> None:
+        self.state.dead_zone = value
+
+    @property
+    def value(self) -> Vec2:
+        return Vec2(self.state.x, self.state.y)
+
+    def update(self) -> None:
+        if self.knob.dragging:
+            if self._drag_started is None:
+                self._on_grab()
+            self.knob.position = Vec2(*self.state.drag_to(self.knob.position.x, self.knob.position.y))
+        else:
+            if self._drag_started is not None:
+                self._on_let_go()
+            self.knob.position = self.knob.start_position
+            self.state.release()
+
+    def _on_grab(self) -> None:
+        self._drag_started = time.perf_counter()
+        if self.telemetry:
+            point = _touch_point(self.knob)
+            if point is not None:
+                # the knob is half the base's size: keep the heatmap in base units
+                self.telemetry.record(self.name, point.x / 2, point.y / 2)
+            else:
+                self.telemetry.count(self.name, 'touches')
+
+    def _on_let_go(self) -> None:
+        if self.telemetry:
+            self.telemetry.count(self.name, 'seconds', time.perf_counter() - self._drag_started)
+        self._drag_started = None
+
+class VirtualButton(Button):
+    def __init__(self, 
+                 key_name: str = 'gamepad a', 
+                 position: tuple = (.5, -.4), 
+                 color=color.azure, 
+                 state: Optional[ButtonState] = None,
+                 telemetry: Optional[TouchTelemetry] = None,
+                 dispatcher: Optional[CallbackDispatcher] = None,
+                 **kwargs
+            ):
+        super().__init__(parent=camera.ui, position=position, color=color, scale=.1, **kwargs)
+        self.state = state if state else ButtonState(key_name)
+        if dispatcher:
+            # callbacks wait for the dispatcher's budget; call its update() every frame
+            self.state.dispatcher = dispatcher
+        self.telemetry = telemetry   # records where presses land, keyed by key_name
+        self._pressed_at = None
+
+    @property
+    def key_name(self) -> str:
+        return self.state.key_name
+
+    @key_name.setter
+    def key_name(self, value: str) -> None:
+        self.state.key_name = value
+
+    @property
+    def is_pressed(self) -> bool:
+        return self.state.is_pressed
+
+    @property
+    def on_press_callbacks(self) -> List[Callable[[str], None]]:
+        return self.state.on_press_callbacks
+
+    @property
+    def on_release_callbacks(self) -> List[Callable[[str], None]]:
+        return self.state.on_release_callbacks
+
+    def on_press(self) -> None:
+        held_keys[self.key_name] = 1
+        if self.telemetry:
+            self._pressed_at = time.perf_counter()
+            point = _touch_point(self)
+            if point is not None:
+                self.telemetry.record(self.key_name, point.x, point.y)
+            else:
+                self.telemetry.count(self.key_name, 'touches')
+        self.state.press()
+
+    def on_release(self) -> None:
+        held_keys[self.key_name] = 0
+        if self.telemetry and self._pressed_at is not None:
+            self.telemetry.count(self.key_name, 'seconds', time.perf_counter() - self._pressed_at)
+            self._pressed_at = None
+        self.state.release()
+
+    def input(self, key: str) -> None:
+        if not self.hovered:
+            return
+        if key == 'left mouse down':
+            self.on_press()
+        elif key == 'left mouse up':
+            self.on_release()
+
+    def add_on_press_callback(self, callback: Callable[[str], None]) -> None:
+        self.state.add_on_press_callback(callback)
+
+    def add_on_release_callback(self, callback: Callable[[str], None]) -> None:
+        self.state.add_on_release_callback(callback)